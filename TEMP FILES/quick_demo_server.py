@@ -1,6 +1,7 @@
 # File: python_ml/quick_demo_server.py
 
 import sys
+import time
 from pathlib import Path
 import numpy as np
 import pickle
@@ -12,6 +13,8 @@ import cv2
 
 sys.path.insert(0, str(Path(__file__).parent))
 import config
+from model_registry import file_version
+from prediction_log import PredictionLog
 
 print("\n╔═══════════════════════════════════════════════════════════╗")
 print("║    FINGERPRINT BLOOD GROUP DETECTION - QUICK DEMO         ║")
@@ -26,6 +29,10 @@ print("✅ Model loaded\n")
 with open(cfg.MODELS_DIR / "preprocessing_artifacts.pkl", 'rb') as f:
     artifacts = pickle.load(f)
 label_encoder = artifacts['label_encoder']
+model_version = file_version(cfg.MODEL_PATH)
+
+prediction_log = PredictionLog()
+prediction_log.start()
 
 print("→ Finding ESP32...")
 ports = list(serial.tools.list_ports.comports())
@@ -66,9 +73,9 @@ def predict_random():
         confidence = pred[0][pred_idx]
         blood_group = label_encoder.classes_[pred_idx]
         
-        return blood_group, confidence
+        return blood_group, confidence, pred[0]
     
-    return random.choice(cfg.BLOOD_GROUPS), 0.85
+    return random.choice(cfg.BLOOD_GROUPS), 0.85, None
 
 while True:
     try:
@@ -81,13 +88,19 @@ while True:
             print("\n" + "─" * 60)
             print("🔮 PREDICTING BLOOD GROUP...")
             
-            blood_group, confidence = predict_random()
+            start = time.perf_counter()
+            blood_group, confidence, all_probs = predict_random()
+            latency = time.perf_counter() - start
             
             print(f"🩸 RESULT: {blood_group} (Confidence: {confidence*100:.1f}%)")
             print("─" * 60 + "\n")
             
             ser.write(f"BLOOD_GROUP:{blood_group}\n".encode())
             
+            if all_probs is not None:
+                prediction_log.record(ser.port, blood_group, confidence, all_probs, latency,
+                                      model_version, label_encoder.classes_)
+            
     except KeyboardInterrupt:
         print("\n\n⚠️  Server stopped")
         break
@@ -95,6 +108,7 @@ while True:
         print(f"Error: {e}")
         continue
 
+prediction_log.close()
 ser.close()
 
 # File: python_ml/quick_demo_server.py
@@ -1,7 +1,12 @@
 import os
+import sys
 from pathlib import Path
 import shutil
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "fingerprint_blood_group_detection" / "python_ml"))
+import config
+from dataset_store import DatasetStore
+
 def create_project_structure():
     """Create organized project structure"""
     
@@ -26,29 +31,18 @@ def create_project_structure():
         print(f"✅ Created: {folder}/")
     
     # Move existing dataset
-    source_dataset = "archive (1)/dataset_blood_group"
-    target_dataset = "dataset/raw"
+    source_dataset = config.Config.DATASET_SOURCE_ROOT
+    target_dataset = config.Config.DATASET_VIEW_DIR
     
-    if os.path.exists(source_dataset):
-        print(f"\n📦 Moving dataset from '{source_dataset}' to '{target_dataset}'...")
-        
-        blood_groups = ['A+', 'A-', 'AB+', 'AB-', 'B+', 'B-', 'O+', 'O-']
+    if source_dataset.exists():
+        print(f"\n📦 Ingesting dataset from '{source_dataset}' into '{target_dataset}'...")
         
-        for bg in blood_groups:
-            src = os.path.join(source_dataset, bg)
-            dst = os.path.join(target_dataset, bg)
-            
-            if os.path.exists(src):
-                # Create destination
-                Path(dst).mkdir(parents=True, exist_ok=True)
-                
-                # Copy files
-                files = list(Path(src).glob('*.*'))
-                for file in files:
-                    if file.suffix.lower() in ['.jpg', '.jpeg', '.png', '.bmp', '.tif']:
-                        shutil.copy2(file, dst)
-                
-                print(f"   ✅ {bg}: {len(list(Path(dst).glob('*.*')))} files")
+        # Hash new/changed files once and expose them as hardlinks;
+        # Config.DATASET_ROOT picks the view up once its manifest exists
+        store = DatasetStore(config.Config.DATASET_STORE_DIR)
+        store.ingest(source_dataset)
+        store.build_view(target_dataset, source_root=source_dataset, verify=True)
+        print(f"💾 Source images are now held by the store; '{source_dataset}' can be deleted")
     
     # Move ESP32 code
     old_esp_code = "Verifaication_code_copy_20251124114440"
@@ -20,6 +20,14 @@ HardwareSerial mySerial(2);
 #define RX_PIN 16
 #define TX_PIN 17
 
+// Send the sensor's 512-byte character-file template instead of image data.
+// Much faster over 115200 baud; the server uses it when this station is
+// mapped to the "template" modality in Config.DEVICE_MODALITY.
+#define SEND_TEMPLATE true
+#define TEMPLATE_SIZE 512
+
+uint8_t templateBuffer[TEMPLATE_SIZE];
+
 void setup() {
   Serial.begin(115200);
   delay(1000);
@@ -106,9 +114,20 @@ void detectBloodGroup() {
   // Send marker for Python to detect
   Serial.println("FINGERPRINT_START");
   
-  // In a real implementation, you would download the actual image here
-  // For this demo, we'll send a placeholder
-  Serial.println("FINGERPRINT_DATA:DEMO_MODE");
+  int templateLength = SEND_TEMPLATE ? uploadTemplate(1, templateBuffer, TEMPLATE_SIZE) : -1;
+  
+  if (templateLength > 0) {
+    Serial.print("FINGERPRINT_TEMPLATE:");
+    for (int i = 0; i < templateLength; i++) {
+      if (templateBuffer[i] < 0x10) Serial.print("0");
+      Serial.print(templateBuffer[i], HEX);
+    }
+    Serial.println();
+  } else {
+    // In a real implementation, you would download the actual image here
+    // For this demo, we'll send a placeholder
+    Serial.println("FINGERPRINT_DATA:DEMO_MODE");
+  }
   
   Serial.println("FINGERPRINT_END");
   
@@ -135,6 +154,10 @@ void detectBloodGroup() {
           Serial.println("═══════════════════════════════════════════════════════");
           return;
         }
+        if (response.startsWith("RESCAN")) {
+          Serial.println("\n⚠️  Poor capture quality - please clean the sensor and scan again");
+          return;
+        }
         response = "";
       } else {
         response += c;
@@ -218,4 +241,57 @@ int image2Tz(uint8_t slot) {
   return -1;
 }
 
+int uploadTemplate(uint8_t slot, uint8_t *buffer, int maxLength) {
+  uint8_t packet[] = {0xEF, 0x01, 0xFF, 0xFF, 0xFF, 0xFF, 0x01, 0x00, 0x04, 0x08, slot, 0x00, 0x00};
+  
+  uint16_t sum = 0x01 + 0x00 + 0x04 + 0x08 + slot;
+  packet[11] = (sum >> 8) & 0xFF;
+  packet[12] = sum & 0xFF;
+  
+  while (mySerial.available()) mySerial.read();
+  mySerial.write(packet, sizeof(packet));
+  
+  // Acknowledge packet: 12 bytes, confirmation code at index 9
+  unsigned long startTime = millis();
+  while (mySerial.available() < 12) {
+    if (millis() - startTime > 1000) return -1;
+    delay(1);
+  }
+  uint8_t ack[12];
+  for (int i = 0; i < 12; i++) {
+    ack[i] = mySerial.read();
+  }
+  if (ack[0] != 0xEF || ack[1] != 0x01 || ack[9] != 0x00) return -1;
+  
+  // Data packets: 9-byte header, payload, 2-byte checksum; PID 0x08 ends the transfer
+  int length = 0;
+  uint8_t pid = 0;
+  while (pid != 0x08) {
+    uint8_t header[9];
+    for (int i = 0; i < 9; i++) {
+      startTime = millis();
+      while (!mySerial.available()) {
+        if (millis() - startTime > 1000) return -1;
+      }
+      header[i] = mySerial.read();
+    }
+    if (header[0] != 0xEF || header[1] != 0x01) return -1;
+    
+    pid = header[6];
+    int packetLength = ((header[7] << 8) | header[8]) - 2;
+    for (int i = 0; i < packetLength + 2; i++) {
+      startTime = millis();
+      while (!mySerial.available()) {
+        if (millis() - startTime > 1000) return -1;
+      }
+      uint8_t value = mySerial.read();
+      if (i < packetLength && length < maxLength) {
+        buffer[length++] = value;
+      }
+    }
+  }
+  
+  return length;
+}
+
 // File: esp32_code/complete_system/complete_system.ino
\ No newline at end of file
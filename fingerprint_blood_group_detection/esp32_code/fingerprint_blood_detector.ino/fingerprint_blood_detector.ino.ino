@@ -143,6 +143,11 @@ void loop() {
             gotResult = true;
             break;
           }
+          if (response.startsWith("RESCAN")) {
+            Serial.println("\n⚠️  Poor capture quality - please clean the sensor and scan again");
+            gotResult = true;
+            break;
+          }
           response = "";
         } else {
           response += c;
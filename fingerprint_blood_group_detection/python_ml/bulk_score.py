@@ -0,0 +1,257 @@
+# File: python_ml/bulk_score.py
+
+import os
+import sys
+import csv
+import queue
+import argparse
+import threading
+from pathlib import Path
+import numpy as np
+from tqdm import tqdm
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+from inference_server import BloodGroupPredictor
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff'}
+_DONE = object()
+
+class CSVResultWriter:
+    def __init__(self, output_path, columns):
+        self.output_path = Path(output_path)
+        self.columns = columns
+        self._drop_partial_row()
+        write_header = not self.output_path.exists() or self.output_path.stat().st_size == 0
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.output_path, 'a', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        if write_header:
+            self.writer.writerow(columns)
+    
+    def _drop_partial_row(self):
+        if not self.output_path.exists():
+            return
+        with open(self.output_path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+    
+    def scored_paths(self):
+        self.file.flush()
+        with open(self.output_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            return {row[0] for row in reader if row}
+    
+    def write(self, rows):
+        self.writer.writerows([[row.get(c) for c in self.columns] for row in rows])
+        self.file.flush()
+        os.fsync(self.file.fileno())
+    
+    def close(self):
+        self.file.close()
+
+class ParquetResultWriter:
+    def __init__(self, output_path, columns):
+        import pandas as pd
+        self.pd = pd
+        self.output_dir = Path(output_path)
+        self.columns = columns
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.part = len(list(self.output_dir.glob("part-*.parquet")))
+    
+    def scored_paths(self):
+        paths = set()
+        for part in self.output_dir.glob("part-*.parquet"):
+            paths.update(self.pd.read_parquet(part, columns=['path'])['path'])
+        return paths
+    
+    def write(self, rows):
+        frame = self.pd.DataFrame(rows, columns=self.columns)
+        part_path = self.output_dir / f"part-{self.part:05d}.parquet"
+        tmp_path = part_path.with_name(part_path.name + ".tmp")
+        frame.to_parquet(tmp_path, index=False)
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, part_path)
+        self.part += 1
+    
+    def close(self):
+        pass
+
+class BulkScorer:
+    def __init__(self, input_dir, output_path, output_format='csv', model_path=None,
+                 batch_size=None, decode_workers=None, queue_size=None, flush_rows=None):
+        self.config = config.Config
+        self.input_dir = Path(input_dir)
+        self.output_path = Path(output_path)
+        self.output_format = output_format
+        self.batch_size = batch_size or self.config.BATCH_SIZE
+        self.decode_workers = decode_workers or self.config.BULK_DECODE_WORKERS
+        self.queue_size = queue_size or self.config.BULK_QUEUE_SIZE
+        self.flush_rows = flush_rows or self.config.BULK_FLUSH_ROWS
+        self.checkpoint_path = self.output_path.with_name(self.output_path.name + ".checkpoint")
+        self.predictor = BloodGroupPredictor(model_path=model_path)
+        self.errors = 0
+    
+    def find_images(self):
+        return sorted(
+            p for p in self.input_dir.rglob('*')
+            if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS
+        )
+    
+    def load_checkpoint(self):
+        if not self.checkpoint_path.exists():
+            return set()
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            return {line.rstrip('\n') for line in f if line.strip()}
+    
+    def _walk(self, paths, path_queue):
+        for path in paths:
+            path_queue.put(path)
+        for _ in range(self.decode_workers):
+            path_queue.put(_DONE)
+    
+    def _decode(self, path_queue, decoded_queue):
+        while True:
+            path = path_queue.get()
+            if path is _DONE:
+                decoded_queue.put(_DONE)
+                return
+            
+            relative = path.relative_to(self.input_dir).as_posix()
+            try:
+                image = self.predictor.load_image(path)
+                decoded_queue.put((relative, self.predictor.preprocess_image(image)[0], None))
+            except Exception as e:
+                decoded_queue.put((relative, None, str(e)))
+    
+    def _write(self, write_queue, writer, progress):
+        pending = []
+        with open(self.checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+            while True:
+                rows = write_queue.get()
+                if rows is not _DONE:
+                    pending.extend(rows)
+                
+                if pending and (rows is _DONE or len(pending) >= self.flush_rows):
+                    writer.write(pending)
+                    checkpoint.writelines(row['path'] + '\n' for row in pending)
+                    checkpoint.flush()
+                    os.fsync(checkpoint.fileno())
+                    progress.update(len(pending))
+                    pending = []
+                
+                if rows is _DONE:
+                    writer.close()
+                    return
+    
+    def _predict_batch(self, batch, classes):
+        model, _ = self.predictor.get_active_model()
+        rows = []
+        
+        valid = [item for item in batch if item[1] is not None]
+        if valid:
+            predictions = model.predict(np.stack([item[1] for item in valid]), verbose=0)
+            for (relative, _, _), probs in zip(valid, predictions):
+                idx = int(np.argmax(probs))
+                row = {'path': relative, 'blood_group': classes[idx], 'confidence': float(probs[idx]), 'error': ''}
+                row.update({f"prob_{c}": float(p) for c, p in zip(classes, probs)})
+                rows.append(row)
+        
+        for relative, _, error in batch:
+            if error is not None:
+                self.errors += 1
+                rows.append({'path': relative, 'blood_group': None, 'confidence': None, 'error': error})
+        
+        return rows
+    
+    def run(self):
+        print("\n╔" + "═" * 58 + "╗")
+        print("║" + " " * 18 + "BULK SCORING PIPELINE" + " " * 19 + "║")
+        print("╚" + "═" * 58 + "╝")
+        
+        self.predictor.load_model_and_artifacts()
+        classes = list(self.predictor.label_encoder.classes_)
+        columns = ['path', 'blood_group', 'confidence'] + [f"prob_{c}" for c in classes] + ['error']
+        
+        if self.output_format == 'parquet':
+            writer = ParquetResultWriter(self.output_path, columns)
+        else:
+            writer = CSVResultWriter(self.output_path, columns)
+        
+        print("\n" + "─" * 60)
+        print(f"→ Scanning {self.input_dir}...")
+        all_paths = self.find_images()
+        done = self.load_checkpoint()
+        unrecorded = writer.scored_paths() - done
+        if unrecorded:
+            print(f"⚠️  {len(unrecorded)} row(s) in the output were missing from the checkpoint, skipping them")
+            done |= unrecorded
+        paths = [p for p in all_paths if p.relative_to(self.input_dir).as_posix() not in done]
+        print(f"📊 Found {len(all_paths)} images, {len(all_paths) - len(paths)} already scored, {len(paths)} remaining")
+        
+        if not paths:
+            writer.close()
+            print("✅ Nothing to do")
+            return
+        
+        path_queue = queue.Queue(maxsize=self.queue_size)
+        decoded_queue = queue.Queue(maxsize=self.queue_size)
+        write_queue = queue.Queue(maxsize=max(2, self.queue_size // self.batch_size))
+        progress = tqdm(total=len(paths), desc="Scoring", unit="img")
+        
+        threads = [threading.Thread(target=self._walk, args=(paths, path_queue), daemon=True)]
+        threads += [
+            threading.Thread(target=self._decode, args=(path_queue, decoded_queue), daemon=True)
+            for _ in range(self.decode_workers)
+        ]
+        writer_thread = threading.Thread(target=self._write, args=(write_queue, writer, progress), daemon=True)
+        for thread in threads + [writer_thread]:
+            thread.start()
+        
+        batch = []
+        finished_workers = 0
+        try:
+            while finished_workers < self.decode_workers:
+                item = decoded_queue.get()
+                if item is _DONE:
+                    finished_workers += 1
+                else:
+                    batch.append(item)
+                
+                if len(batch) >= self.batch_size or (batch and finished_workers == self.decode_workers):
+                    write_queue.put(self._predict_batch(batch, classes))
+                    batch = []
+        finally:
+            write_queue.put(_DONE)
+            writer_thread.join()
+            progress.close()
+        
+        print(f"\n✅ Scored {len(paths)} images ({self.errors} unreadable)")
+        print(f"💾 Results written to: {self.output_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable bulk blood group scoring for image directories")
+    parser.add_argument('input_dir', type=Path, help="Directory tree of fingerprint images")
+    parser.add_argument('--output', type=Path, required=True, help="Output CSV file or Parquet directory")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default=None, help="Output format (default: from --output)")
+    parser.add_argument('--model', type=Path, default=None, help="Model file (default: Config.MODEL_PATH)")
+    parser.add_argument('--batch-size', type=int, default=None, help="Prediction batch size")
+    parser.add_argument('--workers', type=int, default=None, help="Decode/resize worker threads")
+    parser.add_argument('--flush-rows', type=int, default=None, help="Rows buffered before each write and checkpoint")
+    args = parser.parse_args()
+    
+    output_format = args.format or ('csv' if args.output.suffix.lower() == '.csv' else 'parquet')
+    
+    scorer = BulkScorer(
+        args.input_dir, args.output, output_format=output_format, model_path=args.model,
+        batch_size=args.batch_size, decode_workers=args.workers, flush_rows=args.flush_rows
+    )
+    scorer.run()
+
+if __name__ == "__main__":
+    main()
+
+# File: python_ml/bulk_score.py
\ No newline at end of file
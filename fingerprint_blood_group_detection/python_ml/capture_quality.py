@@ -0,0 +1,169 @@
+# File: python_ml/capture_quality.py
+
+import sys
+import argparse
+from collections import Counter, defaultdict
+from pathlib import Path
+import numpy as np
+import cv2
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+
+class CaptureRejected(ValueError):
+    def __init__(self, reasons):
+        super().__init__(reasons)
+        self.reasons = reasons
+    
+    def __str__(self):
+        return f"Capture rejected: {', '.join(self.reasons)}"
+
+class CaptureQualityScorer:
+    def __init__(self, min_size=None, min_variance=None, min_ridge_contrast=None,
+                 min_coverage=None, min_sharpness=None, block_size=None, variance_ratio=None):
+        self.config = config.Config
+        self.min_size = min_size or self.config.QUALITY_MIN_SIZE
+        self.min_variance = self.config.QUALITY_MIN_VARIANCE if min_variance is None else min_variance
+        self.min_ridge_contrast = self.config.QUALITY_MIN_RIDGE_CONTRAST if min_ridge_contrast is None else min_ridge_contrast
+        self.min_coverage = self.config.QUALITY_MIN_COVERAGE if min_coverage is None else min_coverage
+        self.min_sharpness = self.config.QUALITY_MIN_SHARPNESS if min_sharpness is None else min_sharpness
+        self.block_size = block_size or self.config.ROI_BLOCK_SIZE
+        self.variance_ratio = variance_ratio or self.config.ROI_VARIANCE_RATIO
+    
+    def _to_gray(self, image):
+        if image.ndim == 2:
+            return image
+        return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    
+    def score_batch(self, images):
+        images = np.asarray(images, dtype=np.float32)
+        count, height, width = images.shape
+        
+        variance = images.var(axis=(1, 2))
+        
+        b = min(self.block_size, height, width)
+        blocks = images[:, :height // b * b, :width // b * b].reshape(count, height // b, b, width // b, b)
+        block_mean = blocks.mean(axis=(2, 4))
+        block_var = np.maximum((blocks * blocks).mean(axis=(2, 4)) - block_mean * block_mean, 0)
+        block_std = np.sqrt(block_var)
+        threshold = self.variance_ratio * np.percentile(block_var.reshape(count, -1), 99, axis=1)
+        foreground = block_var > threshold[:, None, None]
+        
+        coverage = foreground.mean(axis=(1, 2))
+        ridge_contrast = (block_std * foreground).sum(axis=(1, 2)) / np.maximum(foreground.sum(axis=(1, 2)), 1)
+        
+        laplacian = (
+            4 * images[:, 1:-1, 1:-1]
+            - images[:, :-2, 1:-1] - images[:, 2:, 1:-1]
+            - images[:, 1:-1, :-2] - images[:, 1:-1, 2:]
+        )
+        sharpness = laplacian.var(axis=(1, 2))
+        
+        return {
+            'variance': variance,
+            'ridge_contrast': ridge_contrast,
+            'coverage': coverage,
+            'sharpness': sharpness
+        }
+    
+    def rejection_reasons(self, metrics, shape):
+        reasons = []
+        if min(shape) < self.min_size:
+            reasons.append("too_small")
+        if metrics['variance'] < self.min_variance:
+            reasons.append("low_variance")
+        if metrics['ridge_contrast'] < self.min_ridge_contrast:
+            reasons.append("low_ridge_contrast")
+        if metrics['coverage'] < self.min_coverage:
+            reasons.append("partial")
+        if metrics['sharpness'] < self.min_sharpness:
+            reasons.append("blurry")
+        return reasons
+    
+    def score(self, image):
+        gray = self._to_gray(image)
+        metrics = {name: float(values[0]) for name, values in self.score_batch(gray[None]).items()}
+        return metrics, self.rejection_reasons(metrics, gray.shape)
+    
+    def check(self, image):
+        metrics, reasons = self.score(image)
+        if reasons:
+            raise CaptureRejected(reasons)
+        return metrics
+
+def decode_capture(hex_chunks, width=None, height=None):
+    width = width or config.Config.FINGERPRINT_WIDTH
+    height = height or config.Config.FINGERPRINT_HEIGHT
+    if not hex_chunks or "DEMO_MODE" in hex_chunks:
+        return None
+    
+    try:
+        data = np.frombuffer(bytes.fromhex("".join(hex_chunks)), dtype=np.uint8)
+    except ValueError:
+        return None
+    
+    pixels = width * height
+    if len(data) == pixels:
+        gray = data
+    elif len(data) == pixels // 2:
+        gray = np.empty(pixels, dtype=np.uint8)
+        gray[0::2] = (data >> 4) * 17
+        gray[1::2] = (data & 0x0F) * 17
+    else:
+        return None
+    return cv2.cvtColor(gray.reshape(height, width), cv2.COLOR_GRAY2RGB)
+
+def scan_directory(root, batch_size=None):
+    scorer = CaptureQualityScorer()
+    batch_size = batch_size or config.Config.BATCH_SIZE
+    image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff'}
+    paths = sorted(p for p in Path(root).rglob('*') if p.is_file() and p.suffix.lower() in image_extensions)
+    
+    print(f"→ Scoring {len(paths)} images in {root}...")
+    
+    by_shape = defaultdict(list)
+    unreadable = []
+    for path in paths:
+        image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            unreadable.append(path)
+            continue
+        by_shape[image.shape].append((path, image))
+    
+    rejected = []
+    reason_counts = Counter()
+    for shape, items in by_shape.items():
+        for start in range(0, len(items), batch_size):
+            chunk = items[start:start + batch_size]
+            metrics = scorer.score_batch(np.stack([image for _, image in chunk]))
+            for i, (path, _) in enumerate(chunk):
+                reasons = scorer.rejection_reasons({name: values[i] for name, values in metrics.items()}, shape)
+                if reasons:
+                    rejected.append((path, reasons))
+                    reason_counts.update(reasons)
+    
+    print("\n📊 Capture Quality Results:")
+    print("─" * 60)
+    print(f"  ✅ Accepted:      {len(paths) - len(unreadable) - len(rejected)}")
+    print(f"  ❌ Unreadable:    {len(unreadable)}")
+    print(f"  ⚠️  Rejected:      {len(rejected)}")
+    for reason, count in reason_counts.most_common():
+        print(f"     {reason:20s} {count}")
+    
+    return rejected, unreadable
+
+def main():
+    parser = argparse.ArgumentParser(description="Score fingerprint captures with the inference-time quality gate")
+    parser.add_argument('root', type=Path, nargs='?', default=config.Config.DATASET_ROOT, help="Image directory tree")
+    parser.add_argument('--list', action='store_true', help="List every rejected image")
+    args = parser.parse_args()
+    
+    rejected, _ = scan_directory(args.root)
+    if args.list:
+        for path, reasons in rejected:
+            print(f"  - {path} : {', '.join(reasons)}")
+
+if __name__ == "__main__":
+    main()
+
+# File: python_ml/capture_quality.py
\ No newline at end of file
@@ -0,0 +1,133 @@
+# File: python_ml/cascade_predictor.py
+
+import sys
+import time
+from pathlib import Path
+import numpy as np
+from tensorflow.keras.models import load_model
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+from inference_server import BloodGroupPredictor
+
+class CascadePredictor(BloodGroupPredictor):
+    def __init__(self, threshold=None, hot_swap=False):
+        super().__init__(hot_swap=hot_swap)
+        self.fast_model = None
+        self.threshold = self.config.CONFIDENCE_THRESHOLD if threshold is None else threshold
+        self.reset_stats()
+    
+    def reset_stats(self):
+        self.stats = {
+            'fast_answered': 0,
+            'escalated': 0,
+            'fast_time': 0.0,
+            'full_time': 0.0,
+        }
+    
+    def load_model_and_artifacts(self):
+        super().load_model_and_artifacts()
+        
+        if not self.config.FAST_MODEL_PATH.exists():
+            raise FileNotFoundError(f"Fast model not found: {self.config.FAST_MODEL_PATH}")
+        
+        print(f"→ Loading fast model from: {self.config.FAST_MODEL_PATH}")
+        self.fast_model = load_model(self.config.FAST_MODEL_PATH)
+        print("✅ Fast model loaded")
+        
+        self.warm_up()
+        
+        print(f"\n⚡ Cascade enabled: fast model answers when confidence ≥ {self.threshold*100:.0f}%")
+    
+    def warm_up(self):
+        dummy = np.zeros((1, self.config.IMG_HEIGHT, self.config.IMG_WIDTH, self.config.IMG_CHANNELS), dtype=np.float32)
+        for _ in range(self.config.CASCADE_WARMUP_RUNS):
+            self.fast_model.predict(dummy, verbose=0)
+            self.model.predict(dummy, verbose=0)
+    
+    def predict_from_image(self, image):
+        model, label_encoder = self.get_active_model()
+        img_array = self.preprocess_image(image)
+        
+        start = time.perf_counter()
+        predictions = self.fast_model.predict(img_array, verbose=0)[0]
+        fast_elapsed = time.perf_counter() - start
+        self.stats['fast_time'] += fast_elapsed
+        
+        if np.max(predictions) >= self.threshold:
+            self.stats['fast_answered'] += 1
+        else:
+            start = time.perf_counter()
+            predictions = model.predict(img_array, verbose=0)[0]
+            full_elapsed = time.perf_counter() - start
+            self.stats['full_time'] += full_elapsed
+            self.stats['escalated'] += 1
+            predictions = self.apply_tta(model, img_array, predictions, full_elapsed)
+        
+        predicted_class_idx = np.argmax(predictions)
+        confidence = predictions[predicted_class_idx]
+        
+        blood_group = label_encoder.classes_[predicted_class_idx]
+        
+        return blood_group, confidence, predictions
+    
+    def get_stats(self):
+        total = self.stats['fast_answered'] + self.stats['escalated']
+        if total == 0:
+            return None
+        
+        mean_fast = self.stats['fast_time'] / total
+        mean_full = self.stats['full_time'] / self.stats['escalated'] if self.stats['escalated'] else None
+        mean_cost = (self.stats['fast_time'] + self.stats['full_time']) / total
+        
+        summary = {
+            'total': total,
+            'fast_answered': self.stats['fast_answered'],
+            'escalated': self.stats['escalated'],
+            'fast_rate': self.stats['fast_answered'] / total,
+            'mean_fast_ms': mean_fast * 1000,
+            'mean_full_ms': mean_full * 1000 if mean_full is not None else None,
+            'mean_cost_ms': mean_cost * 1000,
+            'saved_ms_per_scan': None,
+        }
+        
+        if mean_full is not None:
+            summary['saved_ms_per_scan'] = (mean_full - mean_cost) * 1000
+        
+        return summary
+    
+    def print_stats(self):
+        summary = self.get_stats()
+        
+        print("\n" + "─" * 60)
+        print("CASCADE STATISTICS")
+        print("─" * 60)
+        
+        if summary is None:
+            print("No predictions made")
+            return
+        
+        print(f"Total scans:         {summary['total']}")
+        print(f"Fast model answered: {summary['fast_answered']} ({summary['fast_rate']*100:.1f}%)")
+        print(f"Escalated to full:   {summary['escalated']} ({(1 - summary['fast_rate'])*100:.1f}%)")
+        print(f"\nMean fast latency:   {summary['mean_fast_ms']:.2f} ms")
+        
+        if summary['mean_full_ms'] is not None:
+            print(f"Mean full latency:   {summary['mean_full_ms']:.2f} ms")
+            print(f"Mean cost per scan:  {summary['mean_cost_ms']:.2f} ms")
+            print(f"Saved per scan:      {summary['saved_ms_per_scan']:.2f} ms")
+        else:
+            print(f"Mean cost per scan:  {summary['mean_cost_ms']:.2f} ms")
+            print("Saved per scan:      n/a (no scan escalated yet)")
+
+def main():
+    predictor = CascadePredictor(hot_swap=config.Config.HOT_SWAP_ENABLED)
+    try:
+        predictor.run_inference_server()
+    finally:
+        predictor.print_stats()
+
+if __name__ == "__main__":
+    main()
+
+# File: python_ml/cascade_predictor.py
\ No newline at end of file
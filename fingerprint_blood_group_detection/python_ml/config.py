@@ -5,19 +5,47 @@ from pathlib import Path
 
 class Config:
     PROJECT_ROOT = Path(__file__).parent.parent
-    DATASET_ROOT = PROJECT_ROOT / "archive(1)" / "dataset_blood_group"
+    DATASET_SOURCE_ROOT = PROJECT_ROOT / "archive(1)" / "dataset_blood_group"
+    DATASET_STORE_DIR = PROJECT_ROOT / "dataset_store"
+    DATASET_VIEW_DIR = DATASET_STORE_DIR / "views" / "default"
+    DATASET_ROOT = DATASET_VIEW_DIR if (DATASET_VIEW_DIR / "manifest.tsv").exists() else DATASET_SOURCE_ROOT
+    TEMPLATE_DATASET_ROOT = PROJECT_ROOT / "template_dataset"
     BLOOD_GROUPS = ["A+", "A-", "AB+", "AB-", "B+", "B-", "O+", "O-"]
     NUM_CLASSES = len(BLOOD_GROUPS)
     MODELS_DIR = PROJECT_ROOT / "python_ml" / "models"
     MODEL_PATH = MODELS_DIR / "blood_group_model.h5"
+    STUDENT_MODEL_PATH = MODELS_DIR / "blood_group_model_student.h5"
+    TEMPLATE_MODEL_PATH = MODELS_DIR / "blood_group_template_model.h5"
+    HEAD_MODEL_PATH = MODELS_DIR / "blood_group_model_head.h5"
+    FAST_MODEL_PATH = STUDENT_MODEL_PATH
     TFLITE_MODEL_PATH = MODELS_DIR / "blood_group_model.tflite"
+    SHARED_MODEL_DIR = MODELS_DIR / "shared"
+    EMBEDDING_STORE_DIR = MODELS_DIR / "embeddings"
+    RUNTIME_PROFILE_DIR = MODELS_DIR / "runtime_profiles"
     LOGS_DIR = PROJECT_ROOT / "python_ml" / "logs"
+    PREDICTION_LOG_PATH = LOGS_DIR / "predictions.db"
     TEST_IMAGES_DIR = PROJECT_ROOT / "python_ml" / "test_images"
     IMG_HEIGHT = 128
     IMG_WIDTH = 128
     IMG_CHANNELS = 3
     IMG_SIZE = (IMG_HEIGHT, IMG_WIDTH)
     NORMALIZE = True
+    USE_ROI_PREPROCESSING = False
+    ROI_ENHANCE_RIDGES = False
+    ROI_BLOCK_SIZE = 16
+    ROI_VARIANCE_RATIO = 0.1
+    ROI_MARGIN = 8
+    ROI_MIN_COVERAGE = 0.05
+    ROI_RIDGE_WAVELENGTH = 9.0
+    ROI_GABOR_ORIENTATIONS = 8
+    ROI_CACHE_DIR = PROJECT_ROOT / "python_ml" / "cache" / "roi"
+    FEATURE_CACHE_DIR = PROJECT_ROOT / "python_ml" / "cache" / "features"
+    QUALITY_GATE_ENABLED = False
+    QUALITY_MIN_SIZE = 50
+    QUALITY_MIN_VARIANCE = 100
+    QUALITY_MIN_RIDGE_CONTRAST = 8.0
+    QUALITY_MIN_COVERAGE = 0.2
+    QUALITY_MIN_SHARPNESS = 20.0
     BATCH_SIZE = 32
     EPOCHS = 50
     LEARNING_RATE = 0.001
@@ -34,16 +62,62 @@ class Config:
         'horizontal_flip': True,
         'fill_mode': 'nearest'
     }
+    TTA_ENABLED = False
+    TTA_VIEWS = 8
+    TTA_CONFIDENCE_CUTOFF = 0.6
+    TTA_AUGMENTATION_SCALE = 0.5
     DROPOUT_RATE = 0.5
+    DISTILLATION_TEMPERATURE = 4.0
+    DISTILLATION_ALPHA = 0.1
+    STUDENT_BASE_FILTERS = 16
+    STUDENT_EPOCHS = 30
+    LATENCY_BENCHMARK_RUNS = 50
+    HEAD_EPOCHS = 100
+    HEAD_LEARNING_RATE = 0.001
     SERIAL_PORT = "COM3"
     BAUD_RATE = 115200
     SERIAL_TIMEOUT = 5
     FINGERPRINT_WIDTH = 256
     FINGERPRINT_HEIGHT = 288
+    TEMPLATE_BYTES = 512
+    TEMPLATE_EPOCHS = 100
+    DEFAULT_MODALITY = "image"
+    DEVICE_MODALITY = {}
     SERVER_HOST = "0.0.0.0"
     SERVER_PORT = 5000
+    PREFORK_WORKERS = None
+    PREFORK_SERIAL_PORTS = []
+    PREFORK_LATENCY_SAMPLES = 1000
+    WORKER_WARMUP_RUNS = 3
+    BULK_DECODE_WORKERS = 4
+    BULK_QUEUE_SIZE = 256
+    BULK_FLUSH_ROWS = 1000
+    INGEST_HASH_WORKERS = 8
+    DATASET_STORE_COPY = False
+    RUNTIME_TUNING_ENABLED = True
+    RUNTIME_TUNE_SECONDS = 5
+    RUNTIME_TUNE_IMAGES = 64
+    RUNTIME_TUNE_MAX_P95_MS = None
+    RUNTIME_TUNE_STARTUP_TIMEOUT = 300
+    PREDICTION_LOG_ENABLED = True
+    PREDICTION_LOG_BATCH_SIZE = 256
+    PREDICTION_LOG_FLUSH_SECONDS = 2.0
+    PREDICTION_LOG_MAX_QUEUE = 10000
+    PREDICTION_LOG_CONNECT_TIMEOUT = 5.0
+    EMBEDDING_SEARCH_BLOCK = 65536
+    EMBEDDING_PAIRWISE_BLOCK = 4096
+    EMBEDDING_KNN_K = 10
+    EMBEDDING_DUPLICATE_THRESHOLD = 0.98
+    EMBEDDING_IVF_LISTS = 256
     DEBUG_MODE = True
     CONFIDENCE_THRESHOLD = 0.6
+    CASCADE_WARMUP_RUNS = 3
+    HOT_SWAP_ENABLED = False
+    HOT_SWAP_ADMIN_PORTS = []
+    HOT_SWAP_POLL_SECONDS = 5
+    HOT_SWAP_WARMUP_RUNS = 3
+    HOT_SWAP_CANARY_SIZE = 32
+    HOT_SWAP_MAX_ACCURACY_DROP = 0.05
     VERBOSE = True
     SAVE_PLOTS = True
     
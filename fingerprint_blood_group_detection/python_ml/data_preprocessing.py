@@ -14,6 +14,8 @@ import pickle
 
 sys.path.insert(0, str(Path(__file__).parent))
 import config
+from fingerprint_roi import FingerprintROIExtractor
+from dataset_store import list_class_images
 
 class DataPreprocessor:
     def __init__(self):
@@ -29,23 +31,30 @@ class DataPreprocessor:
         self.y_val_categorical = None
         self.y_test_categorical = None
         self.class_weights = None
+        self.roi_extractor = FingerprintROIExtractor() if self.config.USE_ROI_PREPROCESSING else None
         
+    def list_image_files(self, folder_path):
+        return list_class_images(folder_path.parent, folder_path.name)
+    
+    def load_image(self, img_file):
+        if self.roi_extractor is not None:
+            return self.roi_extractor.load(img_file)
+        
+        img = cv2.imread(str(img_file))
+        if img is not None:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            img = cv2.resize(img, self.config.IMG_SIZE)
+        return img
+    
     def load_images_from_folder(self, folder_path, blood_group):
-        image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff'}
         images = []
         labels = []
         
-        if not folder_path.exists():
-            return images, labels
-        
-        image_files = [f for f in folder_path.iterdir() if f.is_file() and f.suffix.lower() in image_extensions]
-        
-        for img_file in image_files:
+        for img_file in self.list_image_files(folder_path):
             try:
-                img = cv2.imread(str(img_file))
+                img = self.load_image(img_file)
+                
                 if img is not None:
-                    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                    img = cv2.resize(img, self.config.IMG_SIZE)
                     images.append(img)
                     labels.append(blood_group)
             except Exception as e:
@@ -176,7 +185,8 @@ class DataPreprocessor:
             'class_weights': self.class_weights,
             'blood_groups': self.config.BLOOD_GROUPS,
             'img_size': self.config.IMG_SIZE,
-            'num_classes': self.config.NUM_CLASSES
+            'num_classes': self.config.NUM_CLASSES,
+            'roi_preprocessing': self.roi_extractor.settings() if self.roi_extractor is not None else None
         }
         with open(artifacts_path, 'wb') as f:
             pickle.dump(artifacts, f)
@@ -0,0 +1,278 @@
+# File: python_ml/dataset_store.py
+
+import os
+import sys
+import json
+import stat
+import shutil
+import hashlib
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff'}
+MANIFEST_NAME = "manifest.tsv"
+
+def hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def is_object_name(name):
+    stem = Path(name).stem
+    return len(stem) == 64 and all(c in '0123456789abcdef' for c in stem)
+
+def read_manifest(view_dir):
+    manifest_path = Path(view_dir) / MANIFEST_NAME
+    files = defaultdict(list)
+    if not manifest_path.exists():
+        return files
+    
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        next(f, None)
+        for line in f:
+            blood_group, object_path, _ = line.rstrip('\n').split('\t', 2)
+            files[blood_group].append(manifest_path.parent / object_path)
+    return files
+
+def list_class_images(dataset_root, blood_group):
+    folder = Path(dataset_root) / blood_group
+    if folder.exists():
+        return sorted(f for f in folder.iterdir() if f.is_file() and f.suffix.lower() in IMAGE_EXTENSIONS)
+    return sorted(read_manifest(dataset_root).get(blood_group, []))
+
+class DatasetStore:
+    def __init__(self, store_dir=None, hash_workers=None, copy=None):
+        self.config = config.Config
+        self.store_dir = Path(store_dir) if store_dir is not None else self.config.DATASET_STORE_DIR
+        self.objects_dir = self.store_dir / "objects"
+        self.index_path = self.store_dir / "index.json"
+        self.hash_workers = hash_workers or self.config.INGEST_HASH_WORKERS
+        self.copy = self.config.DATASET_STORE_COPY if copy is None else copy
+        self.index = {}
+        
+        if self.index_path.exists():
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+    
+    def object_path(self, digest, suffix):
+        return self.objects_dir / digest[:2] / f"{digest}{suffix.lower()}"
+    
+    def save_index(self):
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+    
+    def scan_source(self, source_root):
+        found = []
+        for blood_group in self.config.BLOOD_GROUPS:
+            folder = Path(source_root) / blood_group
+            if not folder.exists():
+                continue
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_file() and Path(entry.name).suffix.lower() in IMAGE_EXTENSIONS:
+                        stat = entry.stat()
+                        found.append((blood_group, Path(entry.path).resolve(), stat.st_size, stat.st_mtime_ns))
+        return found
+    
+    def _store_object(self, source, digest):
+        target = self.object_path(digest, source.suffix)
+        if target.exists():
+            return False
+        
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        if self.copy:
+            shutil.copy2(source, tmp_path)
+        else:
+            try:
+                os.link(source, tmp_path)
+            except OSError:
+                shutil.copy2(source, tmp_path)
+        if hash_file(tmp_path) != digest:
+            tmp_path.unlink()
+            raise ValueError(f"❌ {source} changed while being ingested, re-run the ingest")
+        os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(tmp_path, target)
+        return True
+    
+    def verify_objects(self, entries):
+        corrupt = []
+        for digest, suffix in entries:
+            path = self.object_path(digest, suffix)
+            if not path.exists() or hash_file(path) != digest:
+                corrupt.append(path)
+        return corrupt
+    
+    def ingest(self, source_root):
+        print("\n" + "─" * 60)
+        print(f"INGESTING {source_root}")
+        print("─" * 60)
+        
+        found = self.scan_source(source_root)
+        changed = []
+        for blood_group, path, size, mtime_ns in found:
+            entry = self.index.get(str(path))
+            if entry is None or entry['size'] != size or entry['mtime_ns'] != mtime_ns or entry['blood_group'] != blood_group:
+                changed.append((blood_group, path, size, mtime_ns))
+        
+        print(f"📊 Found {len(found)} images, {len(found) - len(changed)} unchanged, {len(changed)} to hash")
+        
+        stored = 0
+        if changed:
+            with ThreadPoolExecutor(max_workers=self.hash_workers) as executor:
+                digests = list(executor.map(hash_file, [path for _, path, _, _ in changed]))
+            
+            for (blood_group, path, size, mtime_ns), digest in zip(changed, digests):
+                try:
+                    if self._store_object(path, digest):
+                        stored += 1
+                except ValueError as e:
+                    print(f"⚠️  {str(e)}")
+                    continue
+                self.index[str(path)] = {
+                    'sha256': digest,
+                    'suffix': path.suffix.lower(),
+                    'blood_group': blood_group,
+                    'size': size,
+                    'mtime_ns': mtime_ns
+                }
+        
+        root = str(Path(source_root).resolve())
+        present = {str(path) for _, path, _, _ in found}
+        removed = [key for key in self.index if key.startswith(root + os.sep) and key not in present]
+        for key in removed:
+            del self.index[key]
+        
+        self.save_index()
+        print(f"✅ {stored} new object(s) stored, {len(changed) - stored} already present, {len(removed)} removed source(s)")
+        return found
+    
+    def view_entries(self, source_root=None):
+        root = str(Path(source_root).resolve()) + os.sep if source_root is not None else None
+        entries = {}
+        conflicts = 0
+        for source, entry in sorted(self.index.items()):
+            if root is not None and not source.startswith(root):
+                continue
+            key = (entry['sha256'], entry['suffix'])
+            previous = entries.setdefault(key, (entry['blood_group'], source))
+            if previous[0] != entry['blood_group']:
+                conflicts += 1
+        if conflicts:
+            print(f"⚠️  {conflicts} image(s) appear under more than one blood group; keeping the first label")
+        return entries
+    
+    def build_view(self, view_dir, source_root=None, use_links=True, verify=False):
+        view_dir = Path(view_dir)
+        view_dir.mkdir(parents=True, exist_ok=True)
+        entries = self.view_entries(source_root)
+        
+        if verify:
+            corrupt = self.verify_objects(entries)
+            if corrupt:
+                raise ValueError(f"❌ {len(corrupt)} store object(s) missing or modified, e.g. {corrupt[0]}")
+            print(f"✅ Verified {len(entries)} store object(s)")
+        
+        wanted = set()
+        linked = 0
+        for (digest, suffix), (blood_group, _) in entries.items():
+            wanted.add(Path(blood_group) / f"{digest}{suffix}")
+        
+        if use_links:
+            for relative in sorted(wanted):
+                link_path = view_dir / relative
+                if link_path.exists():
+                    continue
+                link_path.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.link(self.object_path(link_path.stem, link_path.suffix), link_path)
+                    linked += 1
+                except OSError as e:
+                    print(f"⚠️  Hardlinks unavailable ({str(e)}), falling back to manifest view")
+                    use_links = False
+                    break
+        
+        stale = 0
+        keep = wanted if use_links else set()
+        for blood_group in self.config.BLOOD_GROUPS:
+            folder = view_dir / blood_group
+            if not folder.exists():
+                continue
+            for path in folder.iterdir():
+                if path.is_file() and is_object_name(path.name) and Path(blood_group) / path.name not in keep:
+                    try:
+                        path.unlink()
+                    except PermissionError:
+                        os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+                        path.unlink()
+                    stale += 1
+            if not any(folder.iterdir()):
+                folder.rmdir()
+        
+        manifest_path = view_dir / MANIFEST_NAME
+        tmp_path = manifest_path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("blood_group\tobject\tsource\n")
+            for (digest, suffix), (blood_group, source) in sorted(entries.items(), key=lambda item: item[1]):
+                object_path = os.path.relpath(self.object_path(digest, suffix), view_dir)
+                f.write(f"{blood_group}\t{Path(object_path).as_posix()}\t{source}\n")
+        os.replace(tmp_path, manifest_path)
+        
+        counts = defaultdict(int)
+        for blood_group, _ in entries.values():
+            counts[blood_group] += 1
+        
+        mode = "hardlink" if use_links else "manifest"
+        print(f"✅ {mode.capitalize()} view at {view_dir}: {linked} new link(s), {stale} stale link(s) removed")
+        for blood_group in self.config.BLOOD_GROUPS:
+            print(f"   {blood_group:6s}: {counts[blood_group]} unique images")
+        return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed, incremental dataset ingest")
+    parser.add_argument('source', type=Path, nargs='?', default=config.Config.DATASET_SOURCE_ROOT, help="Folder with one sub-folder per blood group")
+    parser.add_argument('--store', type=Path, default=None, help="Store directory (default: Config.DATASET_STORE_DIR)")
+    parser.add_argument('--view', type=Path, default=None, help="Per-class view directory (default: Config.DATASET_VIEW_DIR)")
+    parser.add_argument('--verify', action='store_true', help="Re-hash every store object before building the view")
+    parser.add_argument('--manifest-only', action='store_true', help="Write the manifest without creating hardlinks")
+    parser.add_argument('--workers', type=int, default=None, help="Parallel hashing threads")
+    parser.add_argument('--copy', action='store_true', help="Copy source images into the store instead of hardlinking them")
+    args = parser.parse_args()
+    
+    if not args.source.exists():
+        raise FileNotFoundError(f"❌ Source dataset not found: {args.source}")
+    
+    print("\n╔" + "═" * 58 + "╗")
+    print("║" + " " * 19 + "DATASET STORE INGEST" + " " * 19 + "║")
+    print("╚" + "═" * 58 + "╝")
+    
+    store = DatasetStore(args.store, hash_workers=args.workers, copy=args.copy or None)
+    store.ingest(args.source)
+    view_dir = args.view or (config.Config.DATASET_VIEW_DIR if args.store is None else store.store_dir / "views" / "default")
+    store.build_view(view_dir, source_root=args.source, use_links=not args.manifest_only, verify=args.verify)
+    if view_dir.resolve() == config.Config.DATASET_VIEW_DIR.resolve():
+        print(f"\n💾 Config.DATASET_ROOT now resolves to: {view_dir}")
+    else:
+        print(f"\n💾 Point Config.DATASET_ROOT at: {view_dir}")
+    if store.copy:
+        print(f"💾 Source images were copied; once a --verify run passes, {args.source} can be deleted to reclaim space")
+    else:
+        print(f"💾 Source images are hardlinked into the store and now read-only; {args.source} can be deleted without affecting it")
+
+if __name__ == "__main__":
+    main()
+
+# File: python_ml/dataset_store.py
\ No newline at end of file
@@ -0,0 +1,270 @@
+# File: python_ml/distillation.py
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers
+from tensorflow.keras.models import Model, load_model
+from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+from data_preprocessing import DataPreprocessor
+
+class Distiller(Model):
+    def __init__(self, student_logits, teacher, temperature, alpha):
+        super().__init__()
+        self.student_logits = student_logits
+        self.teacher = teacher
+        self.temperature = temperature
+        self.alpha = alpha
+        self.teacher.trainable = False
+        self.loss_tracker = tf.keras.metrics.Mean(name="loss")
+        self.accuracy_tracker = tf.keras.metrics.CategoricalAccuracy(name="accuracy")
+    
+    @property
+    def metrics(self):
+        return [self.loss_tracker, self.accuracy_tracker]
+    
+    def call(self, inputs, training=False):
+        return tf.nn.softmax(self.student_logits(inputs, training=training))
+    
+    def compute_distillation_loss(self, y, student_logits, teacher_probs):
+        hard_loss = tf.keras.losses.categorical_crossentropy(y, student_logits, from_logits=True)
+        
+        teacher_logits = tf.math.log(teacher_probs + 1e-7)
+        soft_targets = tf.nn.softmax(teacher_logits / self.temperature)
+        soft_predictions = tf.nn.log_softmax(student_logits / self.temperature)
+        soft_loss = -tf.reduce_sum(soft_targets * soft_predictions, axis=-1) * (self.temperature ** 2)
+        
+        return tf.reduce_mean(self.alpha * hard_loss + (1 - self.alpha) * soft_loss)
+    
+    def train_step(self, data):
+        x, y = data
+        teacher_probs = self.teacher(x, training=False)
+        
+        with tf.GradientTape() as tape:
+            student_logits = self.student_logits(x, training=True)
+            loss = self.compute_distillation_loss(y, student_logits, teacher_probs)
+        
+        gradients = tape.gradient(loss, self.student_logits.trainable_variables)
+        self.optimizer.apply_gradients(zip(gradients, self.student_logits.trainable_variables))
+        
+        self.loss_tracker.update_state(loss)
+        self.accuracy_tracker.update_state(y, tf.nn.softmax(student_logits))
+        return {m.name: m.result() for m in self.metrics}
+    
+    def test_step(self, data):
+        x, y = data
+        teacher_probs = self.teacher(x, training=False)
+        student_logits = self.student_logits(x, training=False)
+        loss = self.compute_distillation_loss(y, student_logits, teacher_probs)
+        
+        self.loss_tracker.update_state(loss)
+        self.accuracy_tracker.update_state(y, tf.nn.softmax(student_logits))
+        return {m.name: m.result() for m in self.metrics}
+
+class DistillationTrainer:
+    def __init__(self):
+        self.config = config.Config
+        self.teacher = None
+        self.student = None
+        self.data = None
+    
+    def load_teacher(self):
+        print("\n" + "═" * 60)
+        print("LOADING TEACHER MODEL")
+        print("═" * 60)
+        
+        if not self.config.MODEL_PATH.exists():
+            raise FileNotFoundError(f"Teacher model not found: {self.config.MODEL_PATH}")
+        
+        print(f"→ Loading teacher from: {self.config.MODEL_PATH}")
+        self.teacher = load_model(self.config.MODEL_PATH)
+        print(f"✅ Teacher loaded ({self.teacher.count_params():,} parameters)")
+    
+    def build_student(self):
+        width = self.config.STUDENT_BASE_FILTERS
+        inputs = layers.Input(shape=(self.config.IMG_HEIGHT, self.config.IMG_WIDTH, self.config.IMG_CHANNELS))
+        
+        x = layers.Conv2D(width, 3, strides=2, padding='same', use_bias=False)(inputs)
+        x = layers.BatchNormalization()(x)
+        x = layers.ReLU()(x)
+        
+        for multiplier in (2, 4, 8):
+            x = layers.SeparableConv2D(width * multiplier, 3, padding='same', use_bias=False)(x)
+            x = layers.BatchNormalization()(x)
+            x = layers.ReLU()(x)
+            x = layers.MaxPooling2D(2)(x)
+        
+        x = layers.GlobalAveragePooling2D()(x)
+        x = layers.Dropout(self.config.DROPOUT_RATE)(x)
+        logits = layers.Dense(self.config.NUM_CLASSES, name='logits')(x)
+        outputs = layers.Activation('softmax', name='probabilities')(logits)
+        
+        self.student = Model(inputs, outputs, name='blood_group_student')
+        
+        print("\n" + "─" * 60)
+        print("STUDENT MODEL")
+        print("─" * 60)
+        print(f"Base filters: {width}")
+        print(f"Parameters:   {self.student.count_params():,}")
+        
+        return self.student
+    
+    def train(self):
+        print("\n" + "═" * 60)
+        print("DISTILLING TEACHER INTO STUDENT")
+        print("═" * 60)
+        print(f"Temperature: {self.config.DISTILLATION_TEMPERATURE}")
+        print(f"Alpha (hard label weight): {self.config.DISTILLATION_ALPHA}")
+        
+        student_logits = Model(self.student.input, self.student.get_layer('logits').output)
+        distiller = Distiller(
+            student_logits,
+            self.teacher,
+            temperature=self.config.DISTILLATION_TEMPERATURE,
+            alpha=self.config.DISTILLATION_ALPHA
+        )
+        distiller.compile(optimizer=Adam(learning_rate=self.config.LEARNING_RATE))
+        
+        callbacks = [
+            EarlyStopping(monitor='val_loss', patience=8, restore_best_weights=True),
+            ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=4, min_lr=1e-6)
+        ]
+        
+        datagen = self.data['datagen']
+        if datagen is not None:
+            train_data = datagen.flow(self.data['X_train'], self.data['y_train'], batch_size=self.config.BATCH_SIZE)
+        else:
+            train_data = tf.data.Dataset.from_tensor_slices(
+                (self.data['X_train'], self.data['y_train'])
+            ).shuffle(len(self.data['X_train'])).batch(self.config.BATCH_SIZE)
+        
+        distiller.fit(
+            train_data,
+            validation_data=(self.data['X_val'], self.data['y_val']),
+            epochs=self.config.STUDENT_EPOCHS,
+            callbacks=callbacks,
+            verbose=1 if self.config.VERBOSE else 2
+        )
+        
+        print("✅ Distillation complete")
+    
+    def count_flops(self, model):
+        flops = 0
+        for layer in model.layers:
+            if isinstance(layer, layers.SeparableConv2D):
+                _, h, w, c_in = layer.input_shape
+                _, h_out, w_out, c_out = layer.output_shape
+                kh, kw = layer.kernel_size
+                depth = c_in * layer.depth_multiplier
+                flops += 2 * h_out * w_out * kh * kw * depth
+                flops += 2 * h_out * w_out * depth * c_out
+            elif isinstance(layer, layers.DepthwiseConv2D):
+                _, h_out, w_out, c_out = layer.output_shape
+                kh, kw = layer.kernel_size
+                flops += 2 * h_out * w_out * kh * kw * c_out
+            elif isinstance(layer, layers.Conv2D):
+                c_in = layer.input_shape[-1]
+                _, h_out, w_out, c_out = layer.output_shape
+                kh, kw = layer.kernel_size
+                flops += 2 * h_out * w_out * kh * kw * c_in * c_out // layer.groups
+            elif isinstance(layer, layers.Dense):
+                flops += 2 * layer.input_shape[-1] * layer.units
+        return flops
+    
+    def measure_cpu_latency(self, model):
+        sample = np.zeros((1, self.config.IMG_HEIGHT, self.config.IMG_WIDTH, self.config.IMG_CHANNELS), dtype=np.float32)
+        timings = []
+        
+        with tf.device('/CPU:0'):
+            for _ in range(5):
+                model(sample, training=False)
+            for _ in range(self.config.LATENCY_BENCHMARK_RUNS):
+                start = time.perf_counter()
+                model(sample, training=False)
+                timings.append(time.perf_counter() - start)
+        
+        return np.median(timings) * 1000, np.percentile(timings, 95) * 1000
+    
+    def measure_accuracy(self, model):
+        predictions = model.predict(self.data['X_test'], batch_size=self.config.BATCH_SIZE, verbose=0)
+        return np.mean(np.argmax(predictions, axis=1) == np.argmax(self.data['y_test'], axis=1))
+    
+    def generate_report(self):
+        print("\n" + "═" * 60)
+        print("DISTILLATION REPORT")
+        print("═" * 60)
+        
+        rows = []
+        for name, model in (('Teacher', self.teacher), ('Student', self.student)):
+            print(f"→ Benchmarking {name.lower()}...")
+            latency_p50, latency_p95 = self.measure_cpu_latency(model)
+            rows.append({
+                'name': name,
+                'params': model.count_params(),
+                'flops': self.count_flops(model),
+                'latency_p50': latency_p50,
+                'latency_p95': latency_p95,
+                'accuracy': self.measure_accuracy(model)
+            })
+        
+        teacher, student = rows
+        lines = [
+            f"{'':10s} {'Params':>12s} {'MFLOPs':>10s} {'CPU p50 ms':>11s} {'CPU p95 ms':>11s} {'Accuracy':>9s}"
+        ]
+        for row in rows:
+            lines.append(
+                f"{row['name']:10s} {row['params']:>12,d} {row['flops']/1e6:>10.1f} "
+                f"{row['latency_p50']:>11.2f} {row['latency_p95']:>11.2f} {row['accuracy']:>9.4f}"
+            )
+        lines.append("")
+        lines.append(f"Parameter reduction: {teacher['params'] / max(student['params'], 1):.1f}x")
+        lines.append(f"FLOP reduction:      {teacher['flops'] / max(student['flops'], 1):.1f}x")
+        lines.append(f"CPU speedup (p50):   {teacher['latency_p50'] / max(student['latency_p50'], 1e-9):.1f}x")
+        lines.append(f"Accuracy change:     {(student['accuracy'] - teacher['accuracy'])*100:+.2f} points")
+        
+        report = "\n".join(lines)
+        print("\n" + report)
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_path = self.config.LOGS_DIR / f"distillation_report_{timestamp}.txt"
+        with open(report_path, 'w') as f:
+            f.write(f"Temperature: {self.config.DISTILLATION_TEMPERATURE}\n")
+            f.write(f"Alpha: {self.config.DISTILLATION_ALPHA}\n")
+            f.write(f"Student base filters: {self.config.STUDENT_BASE_FILTERS}\n\n")
+            f.write(report + "\n")
+        print(f"\n💾 Report saved to: {report_path}")
+        
+        return rows
+    
+    def save_student(self):
+        self.student.save(self.config.STUDENT_MODEL_PATH)
+        print(f"💾 Student model saved to: {self.config.STUDENT_MODEL_PATH}")
+    
+    def run(self):
+        print("\n╔" + "═" * 58 + "╗")
+        print("║" + " " * 14 + "KNOWLEDGE DISTILLATION PIPELINE" + " " * 13 + "║")
+        print("╚" + "═" * 58 + "╝")
+        
+        self.config.create_directories()
+        self.load_teacher()
+        self.data = DataPreprocessor().run_full_preprocessing()
+        self.build_student()
+        self.train()
+        self.save_student()
+        return self.generate_report()
+
+def main():
+    trainer = DistillationTrainer()
+    trainer.run()
+
+if __name__ == "__main__":
+    main()
+
+# File: python_ml/distillation.py
\ No newline at end of file
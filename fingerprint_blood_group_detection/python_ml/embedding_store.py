@@ -0,0 +1,356 @@
+# File: python_ml/embedding_store.py
+
+import sys
+import json
+import argparse
+from collections import defaultdict
+from pathlib import Path
+import numpy as np
+from tensorflow.keras.layers import Dense
+from tensorflow.keras.models import Model
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+from inference_server import BloodGroupPredictor
+from data_preprocessing import DataPreprocessor
+
+class EmbeddingExtractor:
+    def __init__(self, predictor):
+        self.config = config.Config
+        self.predictor = predictor
+        model, _ = predictor.get_active_model()
+        last_dense = [layer for layer in model.layers if isinstance(layer, Dense)][-1]
+        self.feature_model = Model(model.inputs, last_dense.input)
+        self.dim = int(self.feature_model.output_shape[-1])
+    
+    def extract(self, batch):
+        return self.feature_model.predict(batch, batch_size=self.config.BATCH_SIZE, verbose=0)
+    
+    def extract_paths(self, paths, batch_size=None):
+        batch_size = batch_size or self.config.BATCH_SIZE
+        for start in range(0, len(paths), batch_size):
+            chunk = paths[start:start + batch_size]
+            valid = []
+            arrays = []
+            for path in chunk:
+                try:
+                    arrays.append(self.predictor.preprocess_image(self.predictor.load_image(path))[0])
+                    valid.append(path)
+                except Exception as e:
+                    print(f"⚠️  Skipping {Path(path).name}: {str(e)}")
+            if arrays:
+                yield valid, self.extract(np.stack(arrays))
+
+class EmbeddingStore:
+    def __init__(self, store_dir=None):
+        self.config = config.Config
+        self.store_dir = Path(store_dir) if store_dir is not None else self.config.EMBEDDING_STORE_DIR
+        self.vectors_path = self.store_dir / "embeddings.f16"
+        self.ids_path = self.store_dir / "ids.tsv"
+        self.meta_path = self.store_dir / "meta.json"
+        self.centroids_path = self.store_dir / "ivf_centroids.npy"
+        self.assignments_path = self.store_dir / "ivf_assignments.i32"
+        
+        self.meta = {}
+        self.ids = []
+        self.labels = []
+        self.id_index = {}
+        self._matrix = None
+        self._centroids = None
+        
+        if self.meta_path.exists():
+            with open(self.meta_path, 'r') as f:
+                self.meta = json.load(f)
+        if self.ids_path.exists():
+            with open(self.ids_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    item_id, _, label = line.rstrip('\n').partition('\t')
+                    self.id_index[item_id] = len(self.ids)
+                    self.ids.append(item_id)
+                    self.labels.append(label or None)
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    @property
+    def dim(self):
+        return self.meta.get('dim')
+    
+    def __contains__(self, item_id):
+        return item_id in self.id_index
+    
+    def _normalize(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+    
+    def matrix(self):
+        if self._matrix is None and len(self):
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float16, mode='r', shape=(len(self), self.dim))
+        return self._matrix
+    
+    def check_model(self, model_version):
+        stored = self.meta.get('model_version')
+        if stored is not None and stored != model_version:
+            raise ValueError(
+                f"❌ Embedding store was built with model {stored}, current model is {model_version}. "
+                f"Rebuild the store in a new directory."
+            )
+    
+    def append(self, ids, vectors, labels=None, model_version=None):
+        vectors = self._normalize(vectors)
+        labels = labels if labels is not None else [None] * len(ids)
+        
+        if self.dim is None:
+            self.meta = {'dim': int(vectors.shape[1]), 'model_version': model_version}
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.meta_path, 'w') as f:
+                json.dump(self.meta, f, indent=2)
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"❌ Embedding dimension {vectors.shape[1]} does not match store ({self.dim})")
+        if model_version is not None:
+            self.check_model(model_version)
+        
+        with open(self.vectors_path, 'ab') as f:
+            f.write(vectors.astype(np.float16).tobytes())
+        with open(self.ids_path, 'a', encoding='utf-8') as f:
+            f.writelines(f"{item_id}\t{label or ''}\n" for item_id, label in zip(ids, labels))
+        
+        if self.centroids_path.exists():
+            with open(self.assignments_path, 'ab') as f:
+                f.write(self._assign(vectors).astype(np.int32).tobytes())
+        
+        for item_id, label in zip(ids, labels):
+            self.id_index[item_id] = len(self.ids)
+            self.ids.append(item_id)
+            self.labels.append(label)
+        self._matrix = None
+    
+    def _merge_top_k(self, best_scores, best_rows, scores, rows, k):
+        all_scores = np.concatenate([best_scores, scores], axis=1)
+        all_rows = np.concatenate([best_rows, np.broadcast_to(rows, scores.shape)], axis=1)
+        if all_scores.shape[1] > k:
+            keep = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+            all_scores = np.take_along_axis(all_scores, keep, axis=1)
+            all_rows = np.take_along_axis(all_rows, keep, axis=1)
+        return all_scores, all_rows
+    
+    def _search_rows(self, queries, k, row_subset=None):
+        matrix = self.matrix()
+        block = self.config.EMBEDDING_SEARCH_BLOCK
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        
+        if row_subset is None:
+            for start in range(0, len(self), block):
+                vectors = np.asarray(matrix[start:start + block], dtype=np.float32)
+                rows = np.arange(start, start + len(vectors))
+                best_scores, best_rows = self._merge_top_k(best_scores, best_rows, queries @ vectors.T, rows, k)
+        else:
+            for start in range(0, len(row_subset), block):
+                rows = row_subset[start:start + block]
+                vectors = np.asarray(matrix[rows], dtype=np.float32)
+                best_scores, best_rows = self._merge_top_k(best_scores, best_rows, queries @ vectors.T, rows, k)
+        
+        order = np.argsort(-best_scores, axis=1)
+        return np.take_along_axis(best_scores, order, axis=1), np.take_along_axis(best_rows, order, axis=1)
+    
+    def search(self, queries, k=5, nprobe=None):
+        if not len(self):
+            return [], np.empty((0, 0), dtype=np.float32)
+        
+        queries = self._normalize(queries)
+        k = min(k, len(self))
+        
+        if nprobe and self.centroids_path.exists():
+            centroids = self._load_centroids()
+            assignments = np.fromfile(self.assignments_path, dtype=np.int32)
+            probes = np.argsort(-(queries @ centroids.T), axis=1)[:, :nprobe]
+            results = [
+                self._search_rows(query[None], k, np.flatnonzero(np.isin(assignments, probe)))
+                for query, probe in zip(queries, probes)
+            ]
+            scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+            rows = np.full((len(queries), k), -1, dtype=np.int64)
+            for i, (s, r) in enumerate(results):
+                scores[i, :s.shape[1]] = s[0]
+                rows[i, :r.shape[1]] = r[0]
+        else:
+            scores, rows = self._search_rows(queries, k)
+        
+        ids = [[self.ids[r] for r in row if r >= 0] for row in rows]
+        return ids, scores
+    
+    def classify(self, queries, k=None):
+        k = k or self.config.EMBEDDING_KNN_K
+        ids, scores = self.search(queries, k)
+        predictions = []
+        for neighbour_ids, neighbour_scores in zip(ids, scores):
+            votes = defaultdict(float)
+            for item_id, score in zip(neighbour_ids, neighbour_scores):
+                label = self.labels[self.id_index[item_id]]
+                if label:
+                    votes[label] += float(score)
+            if not votes:
+                predictions.append((None, 0.0))
+                continue
+            label = max(votes, key=votes.get)
+            predictions.append((label, votes[label] / sum(votes.values())))
+        return predictions
+    
+    def find_duplicates(self, threshold=None):
+        threshold = threshold or self.config.EMBEDDING_DUPLICATE_THRESHOLD
+        matrix = self.matrix()
+        block = self.config.EMBEDDING_PAIRWISE_BLOCK
+        pairs = []
+        
+        for start in range(0, len(self), block):
+            left = np.asarray(matrix[start:start + block], dtype=np.float32)
+            for other in range(start, len(self), block):
+                right = np.asarray(matrix[other:other + block], dtype=np.float32)
+                scores = left @ right.T
+                if other == start:
+                    scores = np.triu(scores, k=1)
+                for i, j in zip(*np.nonzero(scores >= threshold)):
+                    pairs.append((self.ids[start + i], self.ids[other + j], float(scores[i, j])))
+        
+        return sorted(pairs, key=lambda pair: -pair[2])
+    
+    def _load_centroids(self):
+        if self._centroids is None:
+            self._centroids = np.load(self.centroids_path)
+        return self._centroids
+    
+    def _assign(self, vectors):
+        return np.argmax(vectors @ self._load_centroids().T, axis=1)
+    
+    def build_ivf(self, n_lists=None, iterations=10):
+        if len(self) == 0:
+            raise ValueError("❌ Embedding store is empty")
+        n_lists = min(n_lists or self.config.EMBEDDING_IVF_LISTS, len(self))
+        matrix = self.matrix()
+        rng = np.random.default_rng(42)
+        
+        sample_size = min(len(self), n_lists * 256)
+        sample = np.asarray(matrix[np.sort(rng.choice(len(self), sample_size, replace=False))], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+        
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty = np.bincount(assignment, minlength=n_lists) == 0
+            sums[empty] = sample[rng.choice(len(sample), empty.sum())]
+            centroids = self._normalize(sums)
+        
+        np.save(self.centroids_path, centroids)
+        self._centroids = centroids
+        
+        block = self.config.EMBEDDING_SEARCH_BLOCK
+        with open(self.assignments_path, 'wb') as f:
+            for start in range(0, len(self), block):
+                vectors = np.asarray(matrix[start:start + block], dtype=np.float32)
+                f.write(self._assign(vectors).astype(np.int32).tobytes())
+        
+        print(f"✅ IVF index built: {n_lists} lists over {len(self)} embeddings")
+
+def build_from_dataset(store, extractor, model_version):
+    store.check_model(model_version)
+    preprocessor = DataPreprocessor()
+    paths = []
+    labels = []
+    for blood_group in config.Config.BLOOD_GROUPS:
+        folder_path = config.Config.DATASET_ROOT / blood_group
+        for img_file in sorted(preprocessor.list_image_files(folder_path)):
+            if f"{blood_group}/{img_file.name}" not in store:
+                paths.append(img_file)
+                labels.append(blood_group)
+    
+    print(f"→ {len(paths)} new dataset image(s) to embed ({len(store)} already stored)")
+    label_by_path = dict(zip(paths, labels))
+    for valid, vectors in extractor.extract_paths(paths):
+        store.append(
+            [f"{label_by_path[p]}/{p.name}" for p in valid],
+            vectors,
+            labels=[label_by_path[p] for p in valid],
+            model_version=model_version
+        )
+    print(f"✅ Embedding store now holds {len(store)} vectors")
+
+def add_scans(store, extractor, model_version, targets, label=None):
+    store.check_model(model_version)
+    if label is not None and label not in config.Config.BLOOD_GROUPS:
+        raise ValueError(f"❌ Unknown blood group: {label}")
+    
+    preprocessor = DataPreprocessor()
+    paths = []
+    for target in targets:
+        if target.is_dir():
+            paths.extend(sorted(preprocessor.list_image_files(target)))
+        elif target.is_file():
+            paths.append(target)
+        else:
+            print(f"⚠️  Skipping {target}: not found")
+    
+    paths = [p for p in dict.fromkeys(p.resolve() for p in paths) if str(p) not in store]
+    print(f"→ {len(paths)} new scan(s) to embed ({len(store)} already stored)")
+    for valid, vectors in extractor.extract_paths(paths):
+        store.append(
+            [str(p) for p in valid],
+            vectors,
+            labels=[label] * len(valid),
+            model_version=model_version
+        )
+    print(f"✅ Embedding store now holds {len(store)} vectors")
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding store built on the blood group CNN")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('build', help="Embed new dataset images into the store")
+    add_parser = subparsers.add_parser('add', help="Embed accepted scans (image files or scan directories)")
+    add_parser.add_argument('paths', type=Path, nargs='+')
+    add_parser.add_argument('--label', default=None, help="Confirmed blood group for these scans (default: unlabeled)")
+    ivf_parser = subparsers.add_parser('build-ivf', help="Partition the store into IVF lists")
+    ivf_parser.add_argument('--lists', type=int, default=None)
+    search_parser = subparsers.add_parser('search', help="Find nearest stored images to an image")
+    search_parser.add_argument('image', type=Path)
+    search_parser.add_argument('--k', type=int, default=5)
+    search_parser.add_argument('--nprobe', type=int, default=None)
+    dedupe_parser = subparsers.add_parser('dedupe', help="List near-duplicate pairs")
+    dedupe_parser.add_argument('--threshold', type=float, default=None)
+    parser.add_argument('--store', type=Path, default=None, help="Store directory")
+    args = parser.parse_args()
+    
+    store = EmbeddingStore(args.store)
+    
+    if args.command == 'build-ivf':
+        store.build_ivf(args.lists)
+        return
+    if args.command == 'dedupe':
+        for left, right, score in store.find_duplicates(args.threshold):
+            print(f"{score:.4f}  {left}  {right}")
+        return
+    
+    predictor = BloodGroupPredictor()
+    predictor.load_model_and_artifacts()
+    extractor = EmbeddingExtractor(predictor)
+    
+    if args.command == 'build':
+        build_from_dataset(store, extractor, predictor.get_model_version())
+    elif args.command == 'add':
+        add_scans(store, extractor, predictor.get_model_version(), args.paths, args.label)
+    elif args.command == 'search':
+        store.check_model(predictor.get_model_version())
+        query = extractor.extract(predictor.preprocess_image(predictor.load_image(args.image)))
+        ids, scores = store.search(query, args.k, nprobe=args.nprobe)
+        for item_id, score in zip(ids[0], scores[0]):
+            print(f"{score:.4f}  {item_id}")
+        label, confidence = store.classify(query)[0]
+        print(f"\n🩸 kNN BLOOD GROUP: {label} ({confidence*100:.1f}% of neighbour weight)")
+
+if __name__ == "__main__":
+    main()
+
+# File: python_ml/embedding_store.py
\ No newline at end of file
@@ -0,0 +1,339 @@
+# File: python_ml/esp32_simulator.py
+
+import os
+import sys
+import pty
+import tty
+import json
+import time
+import random
+import select
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+
+def load_recorded_captures(capture_file):
+    captures = []
+    current = None
+    
+    with open(capture_file, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("ESP32: "):
+                line = line[len("ESP32: "):]
+            
+            if line == "FINGERPRINT_START":
+                current = [line]
+            elif current is not None:
+                current.append(line)
+                if line == "FINGERPRINT_END":
+                    captures.append(current)
+                    current = None
+    
+    return captures
+
+def build_synthetic_capture(payload_bytes, chunk_size=64):
+    if payload_bytes <= 0:
+        return ["FINGERPRINT_START", "FINGERPRINT_DATA:DEMO_MODE", "FINGERPRINT_END"]
+    
+    payload = os.urandom(payload_bytes)
+    lines = ["FINGERPRINT_START"]
+    for offset in range(0, payload_bytes, chunk_size):
+        lines.append(f"FINGERPRINT_DATA:{payload[offset:offset + chunk_size].hex()}")
+    lines.append("FINGERPRINT_END")
+    return lines
+
+def build_template_capture(template_bytes=None):
+    template = os.urandom(template_bytes or config.Config.TEMPLATE_BYTES)
+    return ["FINGERPRINT_START", f"FINGERPRINT_TEMPLATE:{template.hex()}", "FINGERPRINT_END"]
+
+class VirtualDevice:
+    def __init__(self, device_id, captures, rate, jitter, timeout, baud_rate, mode):
+        self.device_id = device_id
+        self.captures = captures
+        self.rate = rate
+        self.jitter = jitter
+        self.timeout = timeout
+        self.baud_rate = baud_rate
+        self.mode = mode
+        
+        self.master_fd, self.slave_fd = pty.openpty()
+        tty.setraw(self.slave_fd)
+        self.port = os.ttyname(self.slave_fd)
+        
+        self._buffer = b''
+        self.sent = 0
+        self.answered = 0
+        self.dropped = 0
+        self.rescans = 0
+        self.late_replies = 0
+        self.latencies = []
+    
+    def _write_line(self, line):
+        data = (line + "\n").encode()
+        os.write(self.master_fd, data)
+        if self.baud_rate:
+            time.sleep(len(data) * 10 / self.baud_rate)
+    
+    def _drain(self):
+        while True:
+            ready, _, _ = select.select([self.master_fd], [], [], 0)
+            if not ready:
+                break
+            try:
+                chunk = os.read(self.master_fd, 4096)
+            except OSError:
+                break
+            if not chunk:
+                break
+            self._buffer += chunk
+        
+        lines = self._buffer.split(b'\n')
+        self._buffer = lines.pop()
+        self.late_replies += sum(
+            1 for line in lines
+            if line.strip().startswith(b"BLOOD_GROUP:") or line.strip() == b"RESCAN"
+        )
+    
+    def _readline(self, deadline):
+        while b'\n' not in self._buffer:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None
+            
+            ready, _, _ = select.select([self.master_fd], [], [], remaining)
+            if not ready:
+                continue
+            
+            try:
+                chunk = os.read(self.master_fd, 4096)
+            except OSError:
+                return None
+            if not chunk:
+                return None
+            self._buffer += chunk
+        
+        line, _, self._buffer = self._buffer.partition(b'\n')
+        return line.decode('utf-8', errors='ignore').strip()
+    
+    def scan_once(self):
+        self._drain()
+        
+        if self.mode == 'predict_now':
+            lines = ["PREDICT_NOW"]
+        else:
+            lines = random.choice(self.captures)
+        
+        for line in lines:
+            self._write_line(line)
+        
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        self.sent += 1
+        
+        while True:
+            line = self._readline(deadline)
+            if line is None:
+                self.dropped += 1
+                return None
+            if line.startswith("BLOOD_GROUP:"):
+                latency = time.perf_counter() - start
+                self.answered += 1
+                self.latencies.append(latency)
+                return latency
+            if line == "RESCAN":
+                self.rescans += 1
+                return None
+    
+    def run(self, stop_event):
+        interval = 1.0 / self.rate
+        time.sleep(random.uniform(0, interval))
+        
+        while not stop_event.is_set():
+            cycle_start = time.perf_counter()
+            self.scan_once()
+            
+            wait = interval * (1 + random.uniform(-self.jitter, self.jitter))
+            remaining = wait - (time.perf_counter() - cycle_start)
+            if remaining > 0:
+                stop_event.wait(remaining)
+    
+    def close(self):
+        os.close(self.master_fd)
+        os.close(self.slave_fd)
+
+class ESP32Simulator:
+    def __init__(self, num_devices, rate, jitter, timeout, baud_rate, mode='capture',
+                 capture_file=None, payload_bytes=0):
+        self.config = config.Config
+        self.mode = mode
+        
+        if capture_file is not None:
+            captures = load_recorded_captures(capture_file)
+            if not captures:
+                raise ValueError(f"❌ No FINGERPRINT_START/END blocks found in: {capture_file}")
+        elif mode == 'template':
+            captures = [build_template_capture()]
+        else:
+            captures = [build_synthetic_capture(payload_bytes)]
+        
+        self.devices = [
+            VirtualDevice(i, captures, rate, jitter, timeout, baud_rate, mode)
+            for i in range(num_devices)
+        ]
+        self.server_process = None
+    
+    def ports(self):
+        return [device.port for device in self.devices]
+    
+    def spawn_server(self, workers=None):
+        command = [sys.executable, str(Path(__file__).parent / "prefork_server.py"), "--ports", *self.ports()]
+        if workers:
+            command += ["--workers", str(workers)]
+        if self.mode == 'template':
+            command += ["--modality", *[f"{port}=template" for port in self.ports()]]
+        
+        print(f"→ Starting server: {' '.join(command)}")
+        self.server_process = subprocess.Popen(command)
+    
+    def run(self, duration):
+        stop_event = threading.Event()
+        threads = [threading.Thread(target=d.run, args=(stop_event,), daemon=True) for d in self.devices]
+        
+        print(f"\n→ Running {len(self.devices)} virtual device(s) for {duration}s...")
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        
+        try:
+            stop_event.wait(duration)
+        except KeyboardInterrupt:
+            print("\n⚠️  Load test stopped by user")
+        finally:
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+        
+        return self.summarize(time.perf_counter() - start)
+    
+    def summarize(self, elapsed):
+        latencies = np.array([l for d in self.devices for l in d.latencies])
+        sent = sum(d.sent for d in self.devices)
+        answered = sum(d.answered for d in self.devices)
+        dropped = sum(d.dropped for d in self.devices)
+        
+        summary = {
+            'devices': len(self.devices),
+            'elapsed_s': elapsed,
+            'sent': sent,
+            'answered': answered,
+            'dropped': dropped,
+            'rescans': sum(d.rescans for d in self.devices),
+            'late_replies': sum(d.late_replies for d in self.devices),
+            'drop_rate': dropped / sent if sent else 0.0,
+            'throughput_per_s': answered / elapsed if elapsed else 0.0,
+            'latency_ms': None
+        }
+        
+        if len(latencies):
+            summary['latency_ms'] = {
+                'mean': latencies.mean() * 1000,
+                'p50': np.percentile(latencies, 50) * 1000,
+                'p95': np.percentile(latencies, 95) * 1000,
+                'p99': np.percentile(latencies, 99) * 1000,
+                'max': latencies.max() * 1000
+            }
+        
+        return summary
+    
+    def print_summary(self, summary):
+        print("\n" + "═" * 60)
+        print("LOAD TEST RESULTS")
+        print("═" * 60)
+        print(f"Devices:       {summary['devices']}")
+        print(f"Duration:      {summary['elapsed_s']:.1f}s")
+        print(f"Requests sent: {summary['sent']}")
+        print(f"Answered:      {summary['answered']}")
+        print(f"Dropped:       {summary['dropped']} ({summary['drop_rate']*100:.2f}%)")
+        print(f"Rescans:       {summary['rescans']}")
+        print(f"Late replies:  {summary['late_replies']}")
+        print(f"Throughput:    {summary['throughput_per_s']:.2f} scans/s")
+        
+        if summary['latency_ms'] is not None:
+            latency = summary['latency_ms']
+            print(f"\nLatency mean:  {latency['mean']:.1f} ms")
+            print(f"Latency p50:   {latency['p50']:.1f} ms")
+            print(f"Latency p95:   {latency['p95']:.1f} ms")
+            print(f"Latency p99:   {latency['p99']:.1f} ms")
+            print(f"Latency max:   {latency['max']:.1f} ms")
+    
+    def save_summary(self, summary):
+        self.config.LOGS_DIR.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_path = self.config.LOGS_DIR / f"load_test_{timestamp}.json"
+        with open(report_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n💾 Results saved to: {report_path}")
+    
+    def close(self):
+        if self.server_process is not None:
+            self.server_process.terminate()
+            self.server_process.wait()
+        for device in self.devices:
+            device.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Virtual ESP32 load generator for the serial inference protocol")
+    parser.add_argument('--devices', type=int, default=4, help="Number of virtual ESP32 boards")
+    parser.add_argument('--rate', type=float, default=0.5, help="Scans per second per device")
+    parser.add_argument('--jitter', type=float, default=0.2, help="Fractional jitter on the scan interval (0-1)")
+    parser.add_argument('--duration', type=float, default=60, help="Test duration in seconds")
+    parser.add_argument('--timeout', type=float, default=5, help="Reply timeout in seconds (firmware uses 5)")
+    parser.add_argument('--baud', type=int, default=config.Config.BAUD_RATE, help="Emulated link speed, 0 for unthrottled")
+    parser.add_argument('--mode', choices=['capture', 'predict_now', 'template'], default='capture', help="Protocol variant to emulate")
+    parser.add_argument('--capture-file', type=Path, default=None, help="Recorded serial log to replay captures from")
+    parser.add_argument('--payload-bytes', type=int, default=0, help="Synthetic capture payload size (0 sends DEMO_MODE, 73728 a raw 256x288 image)")
+    parser.add_argument('--spawn-server', action='store_true', help="Start prefork_server.py on the virtual ports")
+    parser.add_argument('--workers', type=int, default=None, help="Worker count for --spawn-server")
+    parser.add_argument('--startup-wait', type=float, default=30, help="Seconds to wait for a spawned server to load")
+    args = parser.parse_args()
+    
+    print("\n╔" + "═" * 58 + "╗")
+    print("║" + " " * 14 + "VIRTUAL ESP32 LOAD GENERATOR" + " " * 16 + "║")
+    print("╚" + "═" * 58 + "╝")
+    
+    simulator = ESP32Simulator(
+        args.devices, args.rate, args.jitter, args.timeout, args.baud,
+        mode=args.mode, capture_file=args.capture_file, payload_bytes=args.payload_bytes
+    )
+    
+    try:
+        print("\n📟 Virtual ports:")
+        for port in simulator.ports():
+            print(f"   {port}")
+        
+        if args.spawn_server:
+            simulator.spawn_server(args.workers)
+            print(f"→ Waiting {args.startup_wait:.0f}s for server startup...")
+            time.sleep(args.startup_wait)
+        else:
+            if args.mode == 'template':
+                print(f"\n→ Start the server with: --modality {' '.join(f'{port}=template' for port in simulator.ports())}")
+            input("\n→ Point the server at these ports, then press ENTER to start...")
+        
+        summary = simulator.run(args.duration)
+        simulator.print_summary(summary)
+        simulator.save_summary(summary)
+    finally:
+        simulator.close()
+
+if __name__ == "__main__":
+    main()
+
+# File: python_ml/esp32_simulator.py
\ No newline at end of file
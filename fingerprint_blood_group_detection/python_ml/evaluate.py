@@ -0,0 +1,287 @@
+# File: python_ml/evaluate.py
+
+import sys
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import seaborn as sns
+from tqdm import tqdm
+from sklearn.model_selection import train_test_split
+from tensorflow.keras.models import load_model
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+from data_preprocessing import DataPreprocessor
+
+class StreamingMetrics:
+    def __init__(self, name, classes):
+        self.name = name
+        self.classes = list(classes)
+        self.num_classes = len(self.classes)
+        self.confusion = np.zeros((self.num_classes, self.num_classes), dtype=np.int64)
+        self.loss_sum = 0.0
+        self.batch_times = []
+        self.batch_sizes = []
+    
+    def update(self, y_true, probabilities, elapsed):
+        y_pred = np.argmax(probabilities, axis=1)
+        self.confusion += np.bincount(
+            y_true * self.num_classes + y_pred, minlength=self.num_classes ** 2
+        ).reshape(self.num_classes, self.num_classes)
+        
+        true_probs = np.clip(probabilities[np.arange(len(y_true)), y_true], 1e-7, 1.0)
+        self.loss_sum += float(-np.log(true_probs).sum())
+        self.batch_times.append(elapsed)
+        self.batch_sizes.append(len(y_true))
+    
+    @property
+    def total(self):
+        return int(self.confusion.sum())
+    
+    def loss(self):
+        return self.loss_sum / max(self.total, 1)
+    
+    def accuracy(self):
+        return np.trace(self.confusion) / max(self.total, 1)
+    
+    def per_class(self):
+        true_positives = np.diag(self.confusion).astype(np.float64)
+        support = self.confusion.sum(axis=1)
+        predicted = self.confusion.sum(axis=0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precision = np.where(predicted > 0, true_positives / predicted, 0.0)
+            recall = np.where(support > 0, true_positives / support, 0.0)
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        return precision, recall, f1, support
+    
+    def latency_stats(self):
+        if not self.batch_times:
+            return {'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'throughput': 0.0}
+        
+        per_image = np.array(self.batch_times) / np.array(self.batch_sizes) * 1000
+        return {
+            'mean_ms': sum(self.batch_times) / self.total * 1000,
+            'p50_ms': float(np.percentile(per_image, 50)),
+            'p95_ms': float(np.percentile(per_image, 95)),
+            'throughput': self.total / max(sum(self.batch_times), 1e-9)
+        }
+    
+    def classification_report(self, digits=4):
+        precision, recall, f1, support = self.per_class()
+        total = support.sum()
+        width = max(max(len(c) for c in self.classes), len('weighted avg'), digits)
+        headers = ["precision", "recall", "f1-score", "support"]
+        
+        head_fmt = "{:>{width}s} " + " {:>9}" * len(headers)
+        row_fmt = "{:>{width}s} " + " {:>9.{digits}f}" * 3 + " {:>9}\n"
+        
+        report = head_fmt.format("", *headers, width=width) + "\n\n"
+        for i, name in enumerate(self.classes):
+            report += row_fmt.format(name, precision[i], recall[i], f1[i], support[i], width=width, digits=digits)
+        report += "\n"
+        
+        report += ("{:>{width}s} " + " {:>9}" * 2 + " {:>9.{digits}f}" + " {:>9}\n").format(
+            "accuracy", "", "", self.accuracy(), total, width=width, digits=digits
+        )
+        report += row_fmt.format(
+            "macro avg", precision.mean(), recall.mean(), f1.mean(), total, width=width, digits=digits
+        )
+        weights = support / max(total, 1)
+        report += row_fmt.format(
+            "weighted avg", (precision * weights).sum(), (recall * weights).sum(), (f1 * weights).sum(),
+            total, width=width, digits=digits
+        )
+        return report
+    
+    def save_report(self, report_path):
+        stats = self.latency_stats()
+        with open(report_path, 'w') as f:
+            f.write(f"Test Loss: {self.loss():.4f}\n")
+            f.write(f"Test Accuracy: {self.accuracy():.4f}\n\n")
+            f.write(self.classification_report())
+            f.write(f"\nMean latency: {stats['mean_ms']:.2f} ms/image\n")
+            f.write(f"p50 latency: {stats['p50_ms']:.2f} ms/image\n")
+            f.write(f"p95 latency: {stats['p95_ms']:.2f} ms/image\n")
+            f.write(f"Throughput: {stats['throughput']:.1f} images/s\n")
+    
+    def save_confusion_matrix(self, plot_path):
+        plt.figure(figsize=(10, 8))
+        sns.heatmap(
+            self.confusion, annot=True, fmt='d', cmap='Blues',
+            xticklabels=self.classes, yticklabels=self.classes
+        )
+        plt.title(f"Confusion Matrix - {self.name}")
+        plt.ylabel('True Blood Group')
+        plt.xlabel('Predicted Blood Group')
+        plt.tight_layout()
+        plt.savefig(plot_path, dpi=300, bbox_inches='tight')
+        plt.close()
+
+class StreamingEvaluator:
+    def __init__(self, model_paths=None, split='test', batch_size=None, decode_workers=None, prefetch=2):
+        self.config = config.Config
+        self.model_paths = [Path(p) for p in (model_paths or [self.config.MODEL_PATH])]
+        self.split = split
+        self.batch_size = batch_size or self.config.BATCH_SIZE
+        self.decode_workers = decode_workers or self.config.BULK_DECODE_WORKERS
+        self.prefetch = prefetch
+        self.preprocessor = DataPreprocessor()
+        self.preprocessor.label_encoder.fit(self.config.BLOOD_GROUPS)
+        self.models = {}
+        self.metrics = {}
+    
+    def load_models(self):
+        print("\n" + "═" * 60)
+        print("LOADING MODELS")
+        print("═" * 60)
+        
+        classes = self.preprocessor.label_encoder.classes_
+        for path in self.model_paths:
+            if not path.exists():
+                raise FileNotFoundError(f"❌ Model not found: {path}")
+            
+            name = path.stem
+            if name in self.models:
+                name = f"{path.parent.name}_{name}"
+            print(f"→ Loading {name} from: {path}")
+            self.models[name] = load_model(path, compile=False)
+            self.metrics[name] = StreamingMetrics(name, classes)
+        
+        print(f"✅ Loaded {len(self.models)} model(s)")
+    
+    def collect_samples(self):
+        print("\n" + "─" * 60)
+        print("COLLECTING EVALUATION SAMPLES")
+        print("─" * 60)
+        
+        paths = []
+        labels = []
+        for blood_group in self.config.BLOOD_GROUPS:
+            files = self.preprocessor.list_image_files(self.config.DATASET_ROOT / blood_group)
+            paths.extend(files)
+            labels.extend([blood_group] * len(files))
+        
+        if not paths:
+            raise ValueError("❌ No images found! Check your dataset path.")
+        
+        y = self.preprocessor.label_encoder.transform(labels)
+        indices = np.arange(len(paths))
+        if self.split == 'test':
+            _, indices = train_test_split(
+                indices, test_size=self.config.TEST_SPLIT, random_state=42, stratify=y
+            )
+        
+        print(f"📊 Evaluating {len(indices)} of {len(paths)} images ({self.split} split)")
+        return [paths[i] for i in indices], y[indices]
+    
+    def _decode_batch(self, executor, paths, labels):
+        images = list(executor.map(self.preprocessor.load_image, paths))
+        keep = [i for i, img in enumerate(images) if img is not None]
+        if len(keep) < len(images):
+            skipped = len(images) - len(keep)
+            print(f"⚠️  Skipped {skipped} unreadable image(s)")
+        
+        if not keep:
+            return None, None
+        
+        batch = np.stack([images[i] for i in keep]).astype(np.float32)
+        if self.config.NORMALIZE:
+            batch /= 255.0
+        return batch, labels[keep]
+    
+    def stream_batches(self, paths, labels):
+        starts = range(0, len(paths), self.batch_size)
+        with ThreadPoolExecutor(max_workers=self.decode_workers) as decoders, \
+                ThreadPoolExecutor(max_workers=self.prefetch) as prefetchers:
+            pending = [
+                prefetchers.submit(
+                    self._decode_batch, decoders, paths[s:s + self.batch_size], labels[s:s + self.batch_size]
+                )
+                for s in starts[:self.prefetch]
+            ]
+            for s in starts[self.prefetch:]:
+                yield pending.pop(0).result()
+                pending.append(prefetchers.submit(
+                    self._decode_batch, decoders, paths[s:s + self.batch_size], labels[s:s + self.batch_size]
+                ))
+            for future in pending:
+                yield future.result()
+    
+    def evaluate(self):
+        paths, labels = self.collect_samples()
+        
+        print("\n" + "─" * 60)
+        print("STREAMING EVALUATION")
+        print("─" * 60)
+        
+        progress = tqdm(total=len(paths), desc="Evaluating", unit="img")
+        for batch, batch_labels in self.stream_batches(paths, labels):
+            if batch is not None:
+                for name, model in self.models.items():
+                    start = time.perf_counter()
+                    probabilities = model.predict_on_batch(batch)
+                    self.metrics[name].update(batch_labels, np.asarray(probabilities), time.perf_counter() - start)
+                progress.update(len(batch))
+        progress.close()
+    
+    def save_results(self):
+        print("\n" + "═" * 60)
+        print("EVALUATION RESULTS")
+        print("═" * 60)
+        
+        self.config.LOGS_DIR.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        single = len(self.metrics) == 1
+        
+        print(f"{'Model':24s} {'Loss':>8s} {'Accuracy':>9s} {'Mean ms':>8s} {'p95 ms':>8s} {'img/s':>8s}")
+        for name, metrics in self.metrics.items():
+            stats = metrics.latency_stats()
+            print(
+                f"{name[:24]:24s} {metrics.loss():>8.4f} {metrics.accuracy():>9.4f} "
+                f"{stats['mean_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['throughput']:>8.1f}"
+            )
+            
+            suffix = timestamp if single else f"{name}_{timestamp}"
+            report_path = self.config.LOGS_DIR / f"classification_report_{suffix}.txt"
+            metrics.save_report(report_path)
+            if self.config.SAVE_PLOTS:
+                metrics.save_confusion_matrix(self.config.LOGS_DIR / f"confusion_matrix_{suffix}.png")
+        
+        print(f"\n💾 Reports saved to: {self.config.LOGS_DIR}")
+    
+    def run(self):
+        print("\n╔" + "═" * 58 + "╗")
+        print("║" + " " * 16 + "STREAMING MODEL EVALUATION" + " " * 16 + "║")
+        print("╚" + "═" * 58 + "╝")
+        
+        self.load_models()
+        self.evaluate()
+        self.save_results()
+        return self.metrics
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream the held-out set through one or more models")
+    parser.add_argument('models', type=Path, nargs='*', help="Model files (default: Config.MODEL_PATH)")
+    parser.add_argument('--split', choices=['test', 'all'], default='test', help="Evaluate the test split or the whole dataset")
+    parser.add_argument('--batch-size', type=int, default=None, help="Evaluation batch size")
+    parser.add_argument('--workers', type=int, default=None, help="Image decode threads")
+    parser.add_argument('--prefetch', type=int, default=2, help="Batches decoded ahead of prediction")
+    args = parser.parse_args()
+    
+    evaluator = StreamingEvaluator(
+        model_paths=args.models, split=args.split, batch_size=args.batch_size,
+        decode_workers=args.workers, prefetch=max(1, args.prefetch)
+    )
+    evaluator.run()
+
+if __name__ == "__main__":
+    main()
+
+# File: python_ml/evaluate.py
\ No newline at end of file
@@ -0,0 +1,281 @@
+# File: python_ml/feature_cache.py
+
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.utils.class_weight import compute_class_weight
+from tensorflow.keras import layers
+from tensorflow.keras.models import Model, load_model
+from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
+from tensorflow.keras.utils import to_categorical
+from tqdm import tqdm
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+from data_preprocessing import DataPreprocessor
+
+HEAD_LAYER_TYPES = (layers.Dense, layers.Dropout, layers.BatchNormalization, layers.Activation)
+
+def split_backbone(model):
+    head_start = len(model.layers)
+    while head_start > 0 and isinstance(model.layers[head_start - 1], HEAD_LAYER_TYPES):
+        head_start -= 1
+    
+    head_layers = model.layers[head_start:]
+    if not head_layers or head_start == 0:
+        raise ValueError("❌ Could not find a Dense classifier head on top of the backbone")
+    if len(head_layers[0].input.shape) != 2:
+        raise ValueError("❌ Backbone output must be flat (Flatten or global pooling before the head)")
+    
+    backbone = Model(model.inputs, head_layers[0].input, name='backbone')
+    return backbone, head_layers
+
+def build_head(head_layers, feature_dim, reinitialize=False):
+    inputs = layers.Input(shape=(feature_dim,))
+    x = inputs
+    clones = []
+    for layer in head_layers:
+        clone = layer.__class__.from_config(layer.get_config())
+        x = clone(x)
+        clones.append((layer, clone))
+    
+    head = Model(inputs, x, name='head')
+    if not reinitialize:
+        for layer, clone in clones:
+            clone.set_weights(layer.get_weights())
+    return head
+
+def hash_image(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class FeatureCache:
+    def __init__(self, model_path=None, cache_dir=None):
+        self.config = config.Config
+        self.model_path = Path(model_path) if model_path is not None else self.config.MODEL_PATH
+        if not self.model_path.exists():
+            raise FileNotFoundError(f"❌ Model not found: {self.model_path}")
+        
+        self.preprocessor = DataPreprocessor()
+        self.preprocessor.label_encoder.fit(self.config.BLOOD_GROUPS)
+        
+        print(f"→ Loading model from: {self.model_path}")
+        self.model = load_model(self.model_path)
+        self.backbone, self.head_layers = split_backbone(self.model)
+        self.dim = int(self.backbone.output_shape[-1])
+        print(f"✅ Backbone ready ({self.dim}-d features, head of {len(self.head_layers)} layer(s))")
+        
+        backbone_hash = hashlib.sha256()
+        for weights in self.backbone.get_weights():
+            backbone_hash.update(np.ascontiguousarray(weights).tobytes())
+        
+        settings = {
+            'backbone': backbone_hash.hexdigest(),
+            'img_size': list(self.config.IMG_SIZE),
+            'normalize': self.config.NORMALIZE,
+            'roi': self.preprocessor.roi_extractor.settings() if self.preprocessor.roi_extractor is not None else None
+        }
+        self.key = hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:12]
+        cache_root = Path(cache_dir) if cache_dir is not None else self.config.FEATURE_CACHE_DIR
+        self.cache_dir = cache_root / self.key
+        self.vectors_path = self.cache_dir / "features.f32"
+        self.keys_path = self.cache_dir / "keys.txt"
+        self.meta_path = self.cache_dir / "meta.json"
+        
+        self.index = {}
+        
+        if self.keys_path.exists():
+            with open(self.keys_path, 'r', encoding='utf-8') as f:
+                keys = [line.rstrip('\n') for line in f if line.strip()]
+            self.index = {key: row for row, key in enumerate(keys)}
+    
+    def _append(self, keys, vectors):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if not self.meta_path.exists():
+            with open(self.meta_path, 'w') as f:
+                json.dump({'dim': self.dim, 'model_path': str(self.model_path)}, f)
+        
+        with open(self.vectors_path, 'ab') as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.keys_path, 'a', encoding='utf-8') as f:
+            f.writelines(key + '\n' for key in keys)
+        
+        for key in keys:
+            self.index[key] = len(self.index)
+    
+    def _decode(self, path):
+        img = self.preprocessor.load_image(path)
+        if img is None:
+            return None
+        img = img.astype(np.float32)
+        if self.config.NORMALIZE:
+            img /= 255.0
+        return img
+    
+    def features_for(self, paths, batch_size=None):
+        batch_size = batch_size or self.config.BATCH_SIZE
+        image_keys = [hash_image(path) for path in tqdm(paths, desc="Hashing", unit="img")]
+        missing = {}
+        for path, key in zip(paths, image_keys):
+            if key not in self.index and key not in missing:
+                missing[key] = path
+        
+        print(f"📊 {len(paths) - len(missing)} cached, {len(missing)} to extract (cache {self.key})")
+        
+        if missing:
+            items = list(missing.items())
+            for start in tqdm(range(0, len(items), batch_size), desc="Extracting", unit="batch"):
+                chunk = items[start:start + batch_size]
+                keys = []
+                images = []
+                for key, path in chunk:
+                    img = self._decode(path)
+                    if img is None:
+                        print(f"⚠️  Could not read: {path}")
+                        continue
+                    keys.append(key)
+                    images.append(img)
+                if images:
+                    features = self.backbone.predict(np.stack(images), verbose=0)
+                    self._append(keys, features)
+        
+        if not self.index:
+            raise ValueError("❌ No features could be extracted")
+        
+        matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(len(self.index), self.dim))
+        rows = [self.index.get(key) for key in image_keys]
+        valid = np.array([row is not None for row in rows])
+        return np.asarray(matrix[[row for row in rows if row is not None]]), valid
+
+class HeadTrainer:
+    def __init__(self, model_path=None, output_path=None, class_weight_mode='balanced', reinitialize=False):
+        self.config = config.Config
+        self.cache = FeatureCache(model_path)
+        self.output_path = Path(output_path) if output_path is not None else self.config.HEAD_MODEL_PATH
+        self.class_weight_mode = class_weight_mode
+        self.reinitialize = reinitialize
+        self.head = None
+    
+    def collect_samples(self):
+        preprocessor = self.cache.preprocessor
+        paths = []
+        labels = []
+        for blood_group in self.config.BLOOD_GROUPS:
+            files = preprocessor.list_image_files(self.config.DATASET_ROOT / blood_group)
+            paths.extend(files)
+            labels.extend([blood_group] * len(files))
+        
+        if not paths:
+            raise ValueError("❌ No images found! Check your dataset path.")
+        return paths, preprocessor.label_encoder.transform(labels)
+    
+    def class_weights(self, y_train):
+        if self.class_weight_mode == 'none':
+            return None
+        
+        classes = np.unique(y_train)
+        weights = compute_class_weight(class_weight='balanced', classes=classes, y=y_train)
+        if self.class_weight_mode == 'sqrt':
+            weights = np.sqrt(weights)
+        
+        print("\n" + "─" * 60)
+        print(f"CLASS WEIGHTS ({self.class_weight_mode})")
+        print("─" * 60)
+        for i, weight in zip(classes, weights):
+            print(f"   {self.cache.preprocessor.label_encoder.classes_[i]:6s} : {weight:.3f}")
+        return dict(zip(classes, weights))
+    
+    def train(self):
+        print("\n" + "═" * 60)
+        print("LOADING CACHED FEATURES")
+        print("═" * 60)
+        
+        paths, y = self.collect_samples()
+        X, valid = self.cache.features_for(paths)
+        y = y[valid]
+        y_categorical = to_categorical(y, num_classes=self.config.NUM_CLASSES)
+        
+        X_temp, X_test, y_temp, y_test, y_temp_cat, y_test_cat = train_test_split(
+            X, y, y_categorical, test_size=self.config.TEST_SPLIT, random_state=42, stratify=y
+        )
+        val_size_adjusted = self.config.VAL_SPLIT / (1 - self.config.TEST_SPLIT)
+        X_train, X_val, y_train, y_val, y_train_cat, y_val_cat = train_test_split(
+            X_temp, y_temp, y_temp_cat, test_size=val_size_adjusted, random_state=42, stratify=y_temp
+        )
+        
+        self.head = build_head(self.cache.head_layers, self.cache.dim, self.reinitialize)
+        self.head.compile(
+            optimizer=Adam(learning_rate=self.config.HEAD_LEARNING_RATE),
+            loss='categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        
+        print("\n" + "═" * 60)
+        print("TRAINING CLASSIFIER HEAD")
+        print("═" * 60)
+        print(f"Training set:   {len(X_train)} samples")
+        print(f"Validation set: {len(X_val)} samples")
+        print(f"Test set:       {len(X_test)} samples")
+        
+        before = self.head.evaluate(X_test, y_test_cat, verbose=0)[1]
+        callbacks = [
+            EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True),
+            ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=1e-6)
+        ]
+        self.head.fit(
+            X_train, y_train_cat,
+            validation_data=(X_val, y_val_cat),
+            epochs=self.config.HEAD_EPOCHS,
+            batch_size=self.config.BATCH_SIZE,
+            class_weight=self.class_weights(y_train),
+            callbacks=callbacks,
+            verbose=1 if self.config.VERBOSE else 2
+        )
+        
+        test_loss, test_accuracy = self.head.evaluate(X_test, y_test_cat, verbose=0)
+        print(f"\n📊 Test Loss:     {test_loss:.4f}")
+        print(f"📊 Test Accuracy: {test_accuracy:.4f} (was {before:.4f})")
+        return test_accuracy
+    
+    def save(self):
+        backbone = self.cache.backbone
+        model = Model(backbone.input, self.head(backbone.output), name=self.cache.model.name)
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        model.save(self.output_path)
+        print(f"💾 Model with retrained head saved to: {self.output_path}")
+    
+    def run(self):
+        print("\n╔" + "═" * 58 + "╗")
+        print("║" + " " * 15 + "HEAD-ONLY RETRAINING" + " " * 23 + "║")
+        print("╚" + "═" * 58 + "╝")
+        
+        accuracy = self.train()
+        self.save()
+        return accuracy
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrain the classifier head on cached backbone features")
+    parser.add_argument('--model', type=Path, default=None, help="Source model (default: Config.MODEL_PATH)")
+    parser.add_argument('--output', type=Path, default=None, help="Output model (default: Config.HEAD_MODEL_PATH)")
+    parser.add_argument('--class-weights', choices=['balanced', 'sqrt', 'none'], default='balanced', help="Class weighting scheme")
+    parser.add_argument('--reinit', action='store_true', help="Start the head from fresh weights instead of the current ones")
+    parser.add_argument('--extract-only', action='store_true', help="Only fill the feature cache")
+    args = parser.parse_args()
+    
+    trainer = HeadTrainer(args.model, args.output, args.class_weights, args.reinit)
+    if args.extract_only:
+        paths, _ = trainer.collect_samples()
+        trainer.cache.features_for(paths)
+        return
+    
+    trainer.run()
+
+if __name__ == "__main__":
+    main()
+
+# File: python_ml/feature_cache.py
\ No newline at end of file
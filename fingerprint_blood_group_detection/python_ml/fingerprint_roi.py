@@ -0,0 +1,151 @@
+# File: python_ml/fingerprint_roi.py
+
+import os
+import sys
+import json
+import hashlib
+from pathlib import Path
+import numpy as np
+import cv2
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+
+class FingerprintROIExtractor:
+    def __init__(self, enhance=None, block_size=None, variance_ratio=None, margin=None,
+                 ridge_wavelength=None, orientations=None, cache_dir=None):
+        self.config = config.Config
+        self.enhance = self.config.ROI_ENHANCE_RIDGES if enhance is None else enhance
+        self.block_size = block_size or self.config.ROI_BLOCK_SIZE
+        self.variance_ratio = variance_ratio or self.config.ROI_VARIANCE_RATIO
+        self.margin = self.config.ROI_MARGIN if margin is None else margin
+        self.ridge_wavelength = ridge_wavelength or self.config.ROI_RIDGE_WAVELENGTH
+        self.orientations = orientations or self.config.ROI_GABOR_ORIENTATIONS
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else self.config.ROI_CACHE_DIR
+        self._gabor_bank = None
+    
+    def settings(self):
+        return {
+            'enhance': self.enhance,
+            'block_size': self.block_size,
+            'variance_ratio': self.variance_ratio,
+            'margin': self.margin,
+            'ridge_wavelength': self.ridge_wavelength,
+            'orientations': self.orientations
+        }
+    
+    def _to_gray(self, image):
+        if image.ndim == 2:
+            return image
+        return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    
+    def foreground_mask(self, gray):
+        img = gray.astype(np.float32)
+        window = (self.block_size, self.block_size)
+        mean = cv2.boxFilter(img, -1, window)
+        mean_sq = cv2.boxFilter(img * img, -1, window)
+        variance = np.maximum(mean_sq - mean * mean, 0)
+        
+        threshold = self.variance_ratio * np.percentile(variance, 99)
+        mask = (variance > threshold).astype(np.uint8)
+        
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, window)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+        return mask
+    
+    def find_bounding_box(self, mask):
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        if count <= 1:
+            return None
+        
+        largest = 1 + np.argmax(stats[1:, cv2.CC_STAT_AREA])
+        if stats[largest, cv2.CC_STAT_AREA] < self.config.ROI_MIN_COVERAGE * mask.size:
+            return None
+        
+        x, y, w, h = stats[largest, :4]
+        height, width = mask.shape
+        x0, y0 = max(0, x - self.margin), max(0, y - self.margin)
+        x1, y1 = min(width, x + w + self.margin), min(height, y + h + self.margin)
+        return x0, y0, x1, y1
+    
+    def _build_gabor_bank(self):
+        sigma = 0.5 * self.ridge_wavelength
+        size = int(2 * round(3 * sigma) + 1)
+        angles = np.arange(self.orientations) * np.pi / self.orientations
+        self._gabor_bank = [
+            cv2.getGaborKernel((size, size), sigma, theta, self.ridge_wavelength, 1.0, 0, ktype=cv2.CV_32F)
+            for theta in angles
+        ]
+    
+    def enhance_ridges(self, gray, mask):
+        if self._gabor_bank is None:
+            self._build_gabor_bank()
+        
+        img = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(gray).astype(np.float32)
+        img = (img - img.mean()) / (img.std() + 1e-6)
+        
+        gx = cv2.Sobel(img, cv2.CV_32F, 1, 0, ksize=3)
+        gy = cv2.Sobel(img, cv2.CV_32F, 0, 1, ksize=3)
+        window = (self.block_size, self.block_size)
+        gxx = cv2.boxFilter(gx * gx, -1, window)
+        gyy = cv2.boxFilter(gy * gy, -1, window)
+        gxy = cv2.boxFilter(gx * gy, -1, window)
+        orientation = 0.5 * np.arctan2(2 * gxy, gxx - gyy)
+        
+        responses = np.stack([cv2.filter2D(img, cv2.CV_32F, kernel) for kernel in self._gabor_bank])
+        index = np.round(np.mod(orientation, np.pi) / (np.pi / self.orientations)).astype(np.int64) % self.orientations
+        enhanced = np.take_along_axis(responses, index[None], axis=0)[0]
+        
+        enhanced = cv2.normalize(enhanced, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+        enhanced[mask == 0] = 255
+        return enhanced
+    
+    def process(self, image):
+        gray = self._to_gray(image)
+        mask = self.foreground_mask(gray)
+        bbox = self.find_bounding_box(mask)
+        
+        if self.enhance:
+            output = self.enhance_ridges(gray, mask)
+        else:
+            output = gray if image.ndim == 2 else image
+        
+        if bbox is not None:
+            x0, y0, x1, y1 = bbox
+            output = output[y0:y1, x0:x1]
+        
+        if output.ndim == 2:
+            output = cv2.cvtColor(output, cv2.COLOR_GRAY2RGB)
+        return np.ascontiguousarray(output)
+    
+    def _cache_path(self, file_bytes):
+        settings = dict(self.settings(), img_size=list(self.config.IMG_SIZE))
+        settings_key = hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:8]
+        file_key = hashlib.sha256(file_bytes).hexdigest()
+        return self.cache_dir / settings_key / file_key[:2] / f"{file_key}.npy"
+    
+    def load(self, image_path):
+        with open(image_path, 'rb') as f:
+            file_bytes = f.read()
+        
+        cache_path = self._cache_path(file_bytes)
+        if cache_path.exists():
+            try:
+                return np.load(cache_path)
+            except (OSError, ValueError):
+                pass
+        
+        img = cv2.imdecode(np.frombuffer(file_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            return None
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        img = cv2.resize(self.process(img), self.config.IMG_SIZE)
+        
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp.npy")
+        np.save(tmp_path, img)
+        os.replace(tmp_path, cache_path)
+        return img
+
+# File: python_ml/fingerprint_roi.py
\ No newline at end of file
@@ -2,34 +2,64 @@
 
 import os
 import sys
+import time
 from pathlib import Path
 import numpy as np
 import cv2
 import pickle
+import sqlite3
 import serial
 import serial.tools.list_ports
 from tensorflow.keras.models import load_model
 
 sys.path.insert(0, str(Path(__file__).parent))
 import config
+from model_registry import ModelRegistry, MappedTFLiteModel, file_version
+from prediction_log import PredictionLog
+from fingerprint_roi import FingerprintROIExtractor
+from tta import TestTimeAugmenter
+from capture_quality import CaptureQualityScorer, CaptureRejected, decode_capture
+from sensor_template import TemplateClassifier
+from dataset_store import list_class_images
+from runtime_tuning import load_runtime_profile, scale_profile, apply_runtime_profile
 
 class BloodGroupPredictor:
-    def __init__(self):
+    def __init__(self, model_path=None, hot_swap=False):
         self.config = config.Config
+        self.model_path = Path(model_path) if model_path is not None else self.config.MODEL_PATH
+        self.hot_swap = hot_swap
+        self.registry = None
         self.model = None
+        self.model_version = None
         self.label_encoder = None
+        self.roi_extractor = None
+        self.template_classifier = None
+        self.device_modality = dict(self.config.DEVICE_MODALITY)
+        self.tta = TestTimeAugmenter() if self.config.TTA_ENABLED else None
+        self.quality_gate = CaptureQualityScorer() if self.config.QUALITY_GATE_ENABLED else None
         self.serial_port = None
+        self.prediction_log = None
         
-    def load_model_and_artifacts(self):
+    def load_model_and_artifacts(self, shared_model_path=None, num_threads=None):
         print("\n" + "═" * 60)
         print("LOADING MODEL AND ARTIFACTS")
         print("═" * 60)
         
-        if not self.config.MODEL_PATH.exists():
-            raise FileNotFoundError(f"Model not found: {self.config.MODEL_PATH}")
+        if not self.model_path.exists():
+            raise FileNotFoundError(f"Model not found: {self.model_path}")
         
-        print(f"→ Loading model from: {self.config.MODEL_PATH}")
-        self.model = load_model(self.config.MODEL_PATH)
+        if self.config.RUNTIME_TUNING_ENABLED:
+            profile = load_runtime_profile()
+            if profile is not None:
+                apply_runtime_profile(scale_profile(profile, 1))
+        
+        if shared_model_path is not None:
+            print(f"→ Mapping shared model from: {shared_model_path}")
+            self.model = MappedTFLiteModel(shared_model_path, num_threads)
+        else:
+            print(f"→ Loading model from: {self.model_path}")
+            self.model = load_model(self.model_path)
+        self.model_version = file_version(self.model_path)
         print("✅ Model loaded successfully")
         
         artifacts_path = self.config.MODELS_DIR / "preprocessing_artifacts.pkl"
@@ -43,8 +73,72 @@ class BloodGroupPredictor:
         self.label_encoder = artifacts['label_encoder']
         print("✅ Label encoder loaded")
         
+        roi_settings = artifacts.get('roi_preprocessing')
+        if roi_settings:
+            self.roi_extractor = FingerprintROIExtractor(**roi_settings)
+            print(f"✅ ROI preprocessing enabled (ridge enhancement: {'on' if roi_settings['enhance'] else 'off'})")
+        
+        if self.config.TEMPLATE_MODEL_PATH.exists():
+            print(f"→ Loading template model from: {self.config.TEMPLATE_MODEL_PATH}")
+            self.template_classifier = TemplateClassifier().load()
+            print("✅ Template model loaded")
+        
+        if self.quality_gate is not None:
+            print("✅ Capture quality gate enabled (submitted images only, not demo stand-ins)")
+        
+        if self.hot_swap:
+            self.registry = ModelRegistry(self.model_path, self)
+            self.registry.adopt(self.model, self.label_encoder, roi_settings)
+            self.registry.start_watching()
+        
         print(f"\n📊 Model ready to predict {len(self.label_encoder.classes_)} classes:")
         print(f"   {', '.join(self.label_encoder.classes_)}")
+    
+    def get_active_model(self):
+        if self.registry is not None:
+            version = self.registry.current()
+            return version.model, version.label_encoder
+        return self.model, self.label_encoder
+    
+    def get_model_version(self):
+        if self.registry is not None:
+            return self.registry.current().version
+        return self.model_version
+    
+    def log_prediction(self, device, blood_group, confidence, all_probs, latency, modality="image"):
+        if self.prediction_log is None or blood_group is None:
+            return
+        if modality == "template":
+            version = self.template_classifier.version
+            classes = self.template_classifier.label_encoder.classes_
+        else:
+            version = self.get_model_version()
+            classes = self.label_encoder.classes_
+        self.prediction_log.record(device, blood_group, confidence, all_probs, latency, version, classes)
+    
+    def get_modality(self, device):
+        return self.device_modality.get(device, self.config.DEFAULT_MODALITY)
+    
+    def predict_from_template(self, template):
+        if self.template_classifier is None:
+            raise ValueError(f"❌ Template model not loaded: {self.config.TEMPLATE_MODEL_PATH}")
+        return self.template_classifier.predict(template)
+    
+    def handle_admin_command(self, command, device=None):
+        if self.registry is None:
+            print("⚠️  Hot swap disabled, ignoring admin command")
+            return
+        
+        if device is not None and device not in self.config.HOT_SWAP_ADMIN_PORTS:
+            print(f"⚠️  Admin command from {device} ignored (not in Config.HOT_SWAP_ADMIN_PORTS)")
+            return
+        
+        if command == "RELOAD":
+            self.registry.request_reload()
+        elif command == "ROLLBACK":
+            self.registry.rollback()
+        else:
+            print(f"⚠️  Unknown admin command: {command}")
         
     def find_esp32_port(self):
         print("\n" + "─" * 60)
@@ -89,7 +183,20 @@ class BloodGroupPredictor:
             
             return None
     
-    def predict_from_image(self, image):
+    def check_capture(self, image):
+        if self.quality_gate is not None:
+            self.quality_gate.check(image)
+    
+    def get_roi_extractor(self):
+        if self.registry is not None:
+            return self.registry.current().roi_extractor
+        return self.roi_extractor
+    
+    def preprocess_image(self, image, version=None):
+        roi_extractor = version.roi_extractor if version is not None else self.get_roi_extractor()
+        if roi_extractor is not None:
+            image = roi_extractor.process(image)
+        
         img_resized = cv2.resize(image, self.config.IMG_SIZE)
         
         if len(img_resized.shape) == 2:
@@ -100,40 +207,64 @@ class BloodGroupPredictor:
         if self.config.NORMALIZE:
             img_array = img_array / 255.0
         
-        img_array = np.expand_dims(img_array, axis=0)
+        return np.expand_dims(img_array, axis=0)
+    
+    def apply_tta(self, model, img_array, predictions, base_time):
+        if self.tta is None:
+            return predictions
+        
+        if self.tta.should_trigger(np.max(predictions)):
+            return self.tta.predict(model, img_array, predictions, base_time)
+        
+        self.tta.record_skip(base_time)
+        return predictions
+    
+    def predict_from_image(self, image):
+        model, label_encoder = self.get_active_model()
+        img_array = self.preprocess_image(image)
         
-        predictions = self.model.predict(img_array, verbose=0)
+        start = time.perf_counter()
+        predictions = model.predict(img_array, verbose=0)[0]
+        predictions = self.apply_tta(model, img_array, predictions, time.perf_counter() - start)
         
-        predicted_class_idx = np.argmax(predictions[0])
-        confidence = predictions[0][predicted_class_idx]
+        predicted_class_idx = np.argmax(predictions)
+        confidence = predictions[predicted_class_idx]
         
-        blood_group = self.label_encoder.classes_[predicted_class_idx]
+        blood_group = label_encoder.classes_[predicted_class_idx]
         
-        return blood_group, confidence, predictions[0]
+        return blood_group, confidence, predictions
     
     def predict_from_dataset(self):
         print("\n" + "─" * 60)
         print("DEMO MODE: Using random image from dataset")
         print("─" * 60)
         
-        import random
-        blood_group_folder = random.choice(self.config.BLOOD_GROUPS)
-        folder_path = self.config.DATASET_ROOT / blood_group_folder
-        
-        image_files = [f for f in folder_path.iterdir() if f.suffix.lower() in {'.jpg', '.jpeg', '.png', '.bmp'}]
+        random_image_path, blood_group_folder = self.pick_dataset_image()
         
-        if not image_files:
+        if random_image_path is None:
             print("❌ No images found in dataset")
             return None, 0, None
         
-        random_image_path = random.choice(image_files)
         print(f"→ Using image: {random_image_path.name}")
         print(f"→ Actual blood group: {blood_group_folder}")
         
-        image = cv2.imread(str(random_image_path))
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        return self.predict_from_image(self.load_image(random_image_path))
+    
+    def pick_dataset_image(self):
+        import random
+        blood_group_folder = random.choice(self.config.BLOOD_GROUPS)
+        image_files = list_class_images(self.config.DATASET_ROOT, blood_group_folder)
+        
+        if not image_files:
+            return None, blood_group_folder
         
-        return self.predict_from_image(image)
+        return random.choice(image_files), blood_group_folder
+    
+    def load_image(self, image_path):
+        image = cv2.imread(str(image_path))
+        if image is None:
+            raise ValueError(f"Could not read image: {image_path}")
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
     
     def run_inference_server(self):
         print("\n")
@@ -143,6 +274,14 @@ class BloodGroupPredictor:
         
         self.load_model_and_artifacts()
         
+        if self.config.PREDICTION_LOG_ENABLED:
+            self.prediction_log = PredictionLog()
+            try:
+                self.prediction_log.start()
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️  Prediction log unavailable ({str(e)}), continuing without it")
+                self.prediction_log = None
+        
         self.serial_port = self.find_esp32_port()
         
         if self.serial_port is None:
@@ -164,9 +303,15 @@ class BloodGroupPredictor:
         while True:
             try:
                 if demo_mode:
-                    input()
+                    command = input().strip().upper()
+                    if command in ("RELOAD", "ROLLBACK"):
+                        self.handle_admin_command(command)
+                        continue
+                    
                     print("\n" + "─" * 60)
+                    start = time.perf_counter()
                     blood_group, confidence, all_probs = self.predict_from_dataset()
+                    self.log_prediction("demo", blood_group, confidence, all_probs, time.perf_counter() - start)
                     
                     if blood_group is not None:
                         print(f"\n🩸 PREDICTED BLOOD GROUP: {blood_group}")
@@ -184,11 +329,17 @@ class BloodGroupPredictor:
                     if line:
                         print(f"ESP32: {line}")
                     
+                    if line.startswith("ADMIN_"):
+                        self.handle_admin_command(line[len("ADMIN_"):], self.serial_port.port)
+                        continue
+                    
                     if line == "FINGERPRINT_START":
                         print("\n" + "─" * 60)
                         print("→ Receiving fingerprint data...")
                         
                         data_received = False
+                        template = None
+                        chunks = []
                         while True:
                             line = self.serial_port.readline().decode('utf-8', errors='ignore').strip()
                             
@@ -196,18 +347,50 @@ class BloodGroupPredictor:
                                 break
                             
                             if line.startswith("FINGERPRINT_DATA:"):
+                                chunks.append(line[len("FINGERPRINT_DATA:"):])
+                                data_received = True
+                            elif line.startswith("FINGERPRINT_TEMPLATE:"):
+                                template = line[len("FINGERPRINT_TEMPLATE:"):]
                                 data_received = True
                         
                         if data_received:
                             print("✅ Fingerprint data received")
-                            print("→ Running prediction (using demo image)...")
+                            use_template = (
+                                template is not None
+                                and self.template_classifier is not None
+                                and self.get_modality(self.serial_port.port) == "template"
+                            )
+                            
+                            image = None if use_template else decode_capture(chunks)
+                            if image is not None:
+                                try:
+                                    self.check_capture(image)
+                                except CaptureRejected as e:
+                                    self.serial_port.write(b"RESCAN\n")
+                                    print(f"⚠️  {str(e)} - asked ESP32 to rescan")
+                                    print("\n→ Waiting for next fingerprint...")
+                                    continue
                             
-                            blood_group, confidence, all_probs = self.predict_from_dataset()
+                            start = time.perf_counter()
+                            if use_template:
+                                print("→ Running prediction (sensor template)...")
+                                blood_group, confidence, all_probs = self.predict_from_template(template)
+                            elif image is not None:
+                                print("→ Running prediction (sensor image)...")
+                                blood_group, confidence, all_probs = self.predict_from_image(image)
+                            else:
+                                print("→ Running prediction (using demo image)...")
+                                blood_group, confidence, all_probs = self.predict_from_dataset()
+                            latency = time.perf_counter() - start
                             
                             print(f"\n🩸 PREDICTED BLOOD GROUP: {blood_group}")
                             print(f"📊 Confidence: {confidence*100:.2f}%")
                             
                             self.serial_port.write(f"BLOOD_GROUP:{blood_group}\n".encode())
+                            self.log_prediction(
+                                self.serial_port.port, blood_group, confidence, all_probs, latency,
+                                "template" if use_template else "image"
+                            )
                             print(f"✅ Result sent to ESP32: {blood_group}")
                             
                             print("\n→ Waiting for next fingerprint...")
@@ -219,13 +402,22 @@ class BloodGroupPredictor:
                 print(f"\n❌ Error: {str(e)}")
                 continue
         
+        if self.registry is not None:
+            self.registry.stop_watching()
+        
+        if self.prediction_log is not None:
+            self.prediction_log.close()
+        
+        if self.tta is not None:
+            self.tta.print_stats()
+        
         if self.serial_port:
             self.serial_port.close()
         
         print("\n✅ Server shutdown complete")
 
 def main():
-    predictor = BloodGroupPredictor()
+    predictor = BloodGroupPredictor(hot_swap=config.Config.HOT_SWAP_ENABLED)
     predictor.run_inference_server()
 
 if __name__ == "__main__":
@@ -0,0 +1,290 @@
+# File: python_ml/model_registry.py
+
+import os
+import sys
+import hashlib
+import pickle
+import random
+import threading
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from tensorflow.keras.models import load_model
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+from fingerprint_roi import FingerprintROIExtractor
+from dataset_store import list_class_images
+
+def file_version(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+class MappedTFLiteModel:
+    def __init__(self, model_path, num_threads=None):
+        import tensorflow as tf
+        self.name = Path(model_path).stem
+        self.interpreter = tf.lite.Interpreter(
+            model_path=str(model_path),
+            num_threads=num_threads,
+            experimental_op_resolver_type=tf.lite.experimental.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+        )
+        self.interpreter.allocate_tensors()
+        self.input_index = self.interpreter.get_input_details()[0]['index']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+    
+    def predict_on_batch(self, batch):
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        if tuple(self.interpreter.get_input_details()[0]['shape']) != batch.shape:
+            self.interpreter.resize_tensor_input(self.input_index, batch.shape)
+            self.interpreter.allocate_tensors()
+        self.interpreter.set_tensor(self.input_index, batch)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_index).copy()
+    
+    def predict(self, batch, batch_size=None, verbose=0):
+        return self.predict_on_batch(batch)
+
+def export_tflite_model(model_path, output_path):
+    import tensorflow as tf
+    model = load_model(model_path, compile=False)
+    flatbuffer = tf.lite.TFLiteConverter.from_keras_model(model).convert()
+    
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(flatbuffer)
+    os.replace(tmp_path, output_path)
+
+def ensure_shared_model(model_path, context):
+    shared_path = config.Config.SHARED_MODEL_DIR / f"{Path(model_path).stem}_{file_version(model_path)}.tflite"
+    if not shared_path.exists():
+        print(f"→ Exporting shared model to: {shared_path}")
+        exporter = context.Process(target=export_tflite_model, args=(model_path, shared_path))
+        exporter.start()
+        exporter.join()
+        if exporter.exitcode != 0 or not shared_path.exists():
+            raise RuntimeError(f"❌ Could not export shared model from: {model_path}")
+    return shared_path
+
+class ModelVersion:
+    def __init__(self, version, model, label_encoder, model_path, fingerprint, roi_settings=None):
+        self.version = version
+        self.model = model
+        self.label_encoder = label_encoder
+        self.roi_settings = roi_settings
+        self.roi_extractor = FingerprintROIExtractor(**roi_settings) if roi_settings else None
+        self.model_path = model_path
+        self.fingerprint = fingerprint
+        self.loaded_at = datetime.now()
+
+class ModelRegistry:
+    def __init__(self, model_path, predictor):
+        self.config = config.Config
+        self.model_path = Path(model_path) if model_path is not None else self.config.MODEL_PATH
+        self.predictor = predictor
+        self.artifacts_path = self.config.MODELS_DIR / "preprocessing_artifacts.pkl"
+        self.active = None
+        self.previous = None
+        self._swap_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher = None
+        self._seen_fingerprint = None
+        self._canary_batch = None
+    
+    def _file_fingerprint(self):
+        stats = []
+        for path in (self.model_path, self.artifacts_path):
+            if not path.exists():
+                return None
+            stat = path.stat()
+            stats.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(stats)
+    
+    def _load_version(self):
+        fingerprint = self._file_fingerprint()
+        if fingerprint is None:
+            raise FileNotFoundError(f"Model or artifacts missing in: {self.config.MODELS_DIR}")
+        
+        model = load_model(self.model_path)
+        with open(self.artifacts_path, 'rb') as f:
+            artifacts = pickle.load(f)
+        
+        version = ModelVersion(
+            file_version(self.model_path),
+            model,
+            artifacts['label_encoder'],
+            self.model_path,
+            fingerprint,
+            artifacts.get('roi_preprocessing')
+        )
+        self._warm_up(version)
+        return version
+    
+    def _warm_up(self, version):
+        dummy = np.zeros((1, self.config.IMG_HEIGHT, self.config.IMG_WIDTH, self.config.IMG_CHANNELS), dtype=np.float32)
+        for _ in range(self.config.HOT_SWAP_WARMUP_RUNS):
+            version.model.predict(dummy, verbose=0)
+    
+    def _build_canary_batch(self):
+        images = []
+        labels = []
+        
+        for blood_group in self.config.BLOOD_GROUPS:
+            image_files = list_class_images(self.config.DATASET_ROOT, blood_group)
+            per_class = max(1, self.config.HOT_SWAP_CANARY_SIZE // self.config.NUM_CLASSES)
+            for img_file in random.sample(image_files, min(per_class, len(image_files))):
+                try:
+                    images.append(self.predictor.load_image(img_file))
+                except ValueError:
+                    continue
+                labels.append(blood_group)
+        
+        if not images:
+            return None, None
+        return images, labels
+    
+    def _canary_inputs(self, version, images):
+        return np.concatenate([self.predictor.preprocess_image(image, version) for image in images])
+    
+    def _canary_accuracy(self, version, images, labels):
+        predictions = version.model.predict(self._canary_inputs(version, images), verbose=0)
+        predicted = version.label_encoder.classes_[np.argmax(predictions, axis=1)]
+        return predictions, np.mean(predicted == np.array(labels))
+    
+    def canary_check(self, candidate):
+        if self._canary_batch is None:
+            self._canary_batch = self._build_canary_batch()
+        images, labels = self._canary_batch
+        
+        if images is None:
+            shape = (self.config.FINGERPRINT_HEIGHT, self.config.FINGERPRINT_WIDTH, self.config.IMG_CHANNELS)
+            images = [np.random.randint(0, 256, shape, dtype=np.uint8) for _ in range(self.config.HOT_SWAP_CANARY_SIZE)]
+            predictions = candidate.model.predict(self._canary_inputs(candidate, images), verbose=0)
+            candidate_accuracy = None
+        else:
+            predictions, candidate_accuracy = self._canary_accuracy(candidate, images, labels)
+        
+        if predictions.shape != (len(images), self.config.NUM_CLASSES):
+            return False, f"unexpected output shape {predictions.shape}"
+        if not np.all(np.isfinite(predictions)):
+            return False, "non-finite outputs"
+        if not np.allclose(predictions.sum(axis=1), 1.0, atol=1e-3):
+            return False, "outputs are not probabilities"
+        
+        if candidate_accuracy is not None and self.active is not None:
+            _, active_accuracy = self._canary_accuracy(self.active, images, labels)
+            if candidate_accuracy < active_accuracy - self.config.HOT_SWAP_MAX_ACCURACY_DROP:
+                return False, (f"canary accuracy {candidate_accuracy*100:.1f}% vs "
+                               f"active {active_accuracy*100:.1f}%")
+        
+        return True, "ok"
+    
+    def load_initial(self):
+        version = self._load_version()
+        with self._swap_lock:
+            self.active = version
+        self._seen_fingerprint = version.fingerprint
+        print(f"✅ Model version {version.version} active")
+        return version
+    
+    def adopt(self, model, label_encoder, roi_settings=None):
+        version = ModelVersion(
+            file_version(self.model_path),
+            model,
+            label_encoder,
+            self.model_path,
+            self._file_fingerprint(),
+            roi_settings
+        )
+        with self._swap_lock:
+            self.active = version
+        self._seen_fingerprint = version.fingerprint
+        print(f"✅ Model version {version.version} registered for hot swap")
+        return version
+    
+    def current(self):
+        return self.active
+    
+    def _swap(self, candidate):
+        with self._swap_lock:
+            self.previous = self.active
+            self.active = candidate
+        print(f"\n🔄 Model swapped: {self.previous.version if self.previous else '-'} → {candidate.version}")
+    
+    def rollback(self):
+        with self._swap_lock:
+            if self.previous is None:
+                print("\n⚠️  No previous model version to roll back to")
+                return False
+            self.active, self.previous = self.previous, self.active
+        print(f"\n⏪ Rolled back to model version {self.active.version}")
+        return True
+    
+    def reload(self):
+        if not self._reload_lock.acquire(blocking=False):
+            print("\n⚠️  Model reload already in progress")
+            return False
+        
+        try:
+            print("\n→ Loading new model version in background...")
+            self._seen_fingerprint = self._file_fingerprint()
+            candidate = self._load_version()
+            
+            if self.active is not None and candidate.version == self.active.version:
+                print(f"→ Model version {candidate.version} already active")
+                return False
+            
+            passed, reason = self.canary_check(candidate)
+            if not passed:
+                print(f"❌ Canary check failed for {candidate.version}: {reason}")
+                return False
+            
+            self._swap(candidate)
+            return True
+        except Exception as e:
+            print(f"❌ Model reload failed: {str(e)}")
+            return False
+        finally:
+            self._reload_lock.release()
+    
+    def request_reload(self):
+        thread = threading.Thread(target=self.reload, daemon=True)
+        thread.start()
+        return thread
+    
+    def _watch(self):
+        pending = None
+        while not self._stop_event.wait(self.config.HOT_SWAP_POLL_SECONDS):
+            fingerprint = self._file_fingerprint()
+            if fingerprint is None or fingerprint == self._seen_fingerprint:
+                pending = None
+                continue
+            
+            if fingerprint != pending:
+                pending = fingerprint
+                continue
+            
+            pending = None
+            self.reload()
+    
+    def start_watching(self):
+        if self._watcher is not None:
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch, daemon=True)
+        self._watcher.start()
+        print(f"👀 Watching {self.config.MODELS_DIR} for new models (every {self.config.HOT_SWAP_POLL_SECONDS}s)")
+    
+    def stop_watching(self):
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+# File: python_ml/model_registry.py
\ No newline at end of file
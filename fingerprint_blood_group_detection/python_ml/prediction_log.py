@@ -0,0 +1,124 @@
+# File: python_ml/prediction_log.py
+
+import sys
+import json
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+
+_STOP = object()
+
+class PredictionLog:
+    def __init__(self, db_path=None, batch_size=None, flush_seconds=None, max_queue=None):
+        self.config = config.Config
+        self.db_path = Path(db_path) if db_path is not None else self.config.PREDICTION_LOG_PATH
+        self.batch_size = batch_size or self.config.PREDICTION_LOG_BATCH_SIZE
+        self.flush_seconds = flush_seconds or self.config.PREDICTION_LOG_FLUSH_SECONDS
+        self.queue = queue.Queue(maxsize=max_queue or self.config.PREDICTION_LOG_MAX_QUEUE)
+        self.written = 0
+        self.dropped = 0
+        self._thread = None
+    
+    def start(self):
+        if self._thread is not None:
+            return
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connect()
+        self._thread = threading.Thread(target=self._run, args=(connection,), daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        print(f"📝 Logging predictions to: {self.db_path}")
+    
+    def record(self, device, blood_group, confidence, probabilities, latency, model_version, classes):
+        entry = (
+            time.time(),
+            device,
+            blood_group,
+            float(confidence),
+            json.dumps({str(c): round(float(p), 6) for c, p in zip(classes, probabilities)}),
+            latency * 1000,
+            model_version
+        )
+        try:
+            self.queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+    
+    def _connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=self.config.PREDICTION_LOG_CONNECT_TIMEOUT, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "timestamp REAL NOT NULL, "
+            "device TEXT, "
+            "blood_group TEXT, "
+            "confidence REAL, "
+            "probabilities TEXT, "
+            "latency_ms REAL, "
+            "model_version TEXT)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp)")
+        connection.commit()
+        return connection
+    
+    def _write_batch(self, connection, batch):
+        connection.executemany(
+            "INSERT INTO predictions (timestamp, device, blood_group, confidence, probabilities, latency_ms, model_version) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            batch
+        )
+        connection.commit()
+        self.written += len(batch)
+    
+    def _run(self, connection):
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                entry = self.queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                continue
+            
+            while True:
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    entry = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            
+            if batch:
+                try:
+                    self._write_batch(connection, batch)
+                except sqlite3.Error as e:
+                    self.dropped += len(batch)
+                    print(f"❌ Prediction log write failed: {str(e)}")
+        
+        connection.close()
+    
+    def close(self):
+        if self._thread is None:
+            return
+        self.queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        
+        if self.dropped:
+            print(f"⚠️  Prediction log dropped {self.dropped} record(s)")
+        print(f"✅ Prediction log flushed ({self.written} record(s) written)")
+
+# File: python_ml/prediction_log.py
\ No newline at end of file
@@ -0,0 +1,416 @@
+# File: python_ml/prefork_server.py
+
+import os
+import sys
+import time
+import signal
+import argparse
+import itertools
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+import numpy as np
+import serial
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+from inference_server import BloodGroupPredictor
+from model_registry import ensure_shared_model
+from capture_quality import CaptureRejected, decode_capture
+from runtime_tuning import load_runtime_profile, scale_profile, apply_runtime_profile
+
+def read_memory_stats():
+    stats = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].rstrip(':') in ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty'):
+                    stats[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    except OSError:
+        pass
+    return stats
+
+def worker_loop(worker_id, predictor, task_queue, result_queue):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    latencies = deque(maxlen=config.Config.PREFORK_LATENCY_SAMPLES)
+    processed = 0
+    errors = 0
+    rejected = 0
+    busy_time = 0.0
+    started = time.time()
+    
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        
+        kind, job_id, payload = task
+        
+        if kind == 'metrics':
+            result_queue.put(('metrics', job_id, worker_id, {
+                'worker_id': worker_id,
+                'pid': os.getpid(),
+                'processed': processed,
+                'errors': errors,
+                'rejected': rejected,
+                'busy_time': busy_time,
+                'uptime': time.time() - started,
+                'latencies': list(latencies),
+                'memory': read_memory_stats()
+            }))
+            continue
+        
+        start = time.perf_counter()
+        result = None
+        error = None
+        try:
+            if isinstance(payload, dict) and 'template' in payload:
+                blood_group, confidence, all_probs = predictor.predict_from_template(payload['template'])
+            elif isinstance(payload, dict):
+                blood_group, confidence, all_probs = predictor.predict_from_image(predictor.load_image(payload['demo_image']))
+            else:
+                image = predictor.load_image(payload) if isinstance(payload, (str, Path)) else payload
+                predictor.check_capture(image)
+                blood_group, confidence, all_probs = predictor.predict_from_image(image)
+            result = (blood_group, float(confidence), np.asarray(all_probs))
+        except CaptureRejected as e:
+            error = e
+            rejected += 1
+        except Exception as e:
+            error = str(e)
+            errors += 1
+        elapsed = time.perf_counter() - start
+        
+        processed += 1
+        busy_time += elapsed
+        latencies.append(elapsed)
+        result_queue.put(('result', job_id, worker_id, result, error))
+
+def worker_main(worker_id, model_path, shared_model_path, runtime_profile, task_queue, result_queue):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    try:
+        num_threads = None
+        if runtime_profile is not None:
+            apply_runtime_profile(runtime_profile)
+            num_threads = runtime_profile['intra_op_threads']
+        predictor = BloodGroupPredictor(model_path=model_path)
+        predictor.load_model_and_artifacts(shared_model_path, num_threads)
+        dummy = np.zeros((config.Config.IMG_HEIGHT, config.Config.IMG_WIDTH, config.Config.IMG_CHANNELS), dtype=np.uint8)
+        for _ in range(config.Config.WORKER_WARMUP_RUNS):
+            predictor.predict_from_image(dummy)
+    except Exception as e:
+        result_queue.put(('failed', None, worker_id, str(e)))
+        return
+    
+    result_queue.put(('ready', None, worker_id))
+    worker_loop(worker_id, predictor, task_queue, result_queue)
+
+class PreforkServer:
+    def __init__(self, num_workers=None, model_path=None):
+        self.config = config.Config
+        self.predictor = BloodGroupPredictor(model_path=model_path)
+        profile = load_runtime_profile() if self.config.RUNTIME_TUNING_ENABLED else None
+        self.num_workers = num_workers or self.config.PREFORK_WORKERS or (profile and profile['workers']) or os.cpu_count() or 1
+        self.runtime_profile = scale_profile(profile, self.num_workers) if profile else None
+        self.workers = []
+        self.task_queues = []
+        self.result_queue = None
+        self.outstanding = []
+        self.pending = {}
+        self._lock = threading.Lock()
+        self._job_ids = itertools.count()
+        self._collector = None
+        self._stop_event = threading.Event()
+        self.shared_model_path = None
+    
+    def prepare_shared_model(self, context):
+        shared_path = ensure_shared_model(self.predictor.model_path, context)
+        print(f"✅ Shared model: {shared_path.name} ({shared_path.stat().st_size / 1024 / 1024:.1f} MB, mapped read-only by every worker)")
+        return shared_path
+    
+    def start(self):
+        print("\n╔" + "═" * 58 + "╗")
+        print("║" + " " * 15 + "SHARED-MODEL INFERENCE SERVER" + " " * 14 + "║")
+        print("╚" + "═" * 58 + "╝")
+        
+        if not self.predictor.model_path.exists():
+            raise FileNotFoundError(f"❌ Model not found: {self.predictor.model_path}")
+        
+        context = multiprocessing.get_context('spawn')
+        self.shared_model_path = self.prepare_shared_model(context)
+        self.result_queue = context.Queue()
+        
+        if self.runtime_profile is not None:
+            print(f"→ Runtime profile: {self.runtime_profile['intra_op_threads']} intra-op / "
+                  f"{self.runtime_profile['inter_op_threads']} inter-op thread(s) per worker")
+        
+        print(f"\n→ Spawning {self.num_workers} worker(s) on the shared model...")
+        for worker_id in range(self.num_workers):
+            task_queue = context.Queue()
+            process = context.Process(
+                target=worker_main,
+                args=(worker_id, self.predictor.model_path, self.shared_model_path, self.runtime_profile, task_queue, self.result_queue),
+                daemon=True
+            )
+            process.start()
+            self.task_queues.append(task_queue)
+            self.workers.append(process)
+            self.outstanding.append(0)
+        
+        failures = []
+        for _ in range(self.num_workers):
+            message = self.result_queue.get()
+            if message[0] == 'failed':
+                failures.append(f"worker {message[2]}: {message[3]}")
+        if failures:
+            self.stop()
+            raise RuntimeError(f"❌ Worker startup failed ({'; '.join(failures)})")
+        
+        self._collector = threading.Thread(target=self._collect_results, daemon=True)
+        self._collector.start()
+        
+        print(f"✅ {self.num_workers} worker(s) running (pids: {', '.join(str(p.pid) for p in self.workers)})")
+    
+    def _collect_results(self):
+        while True:
+            message = self.result_queue.get()
+            if message is None:
+                break
+            
+            kind, job_id, worker_id = message[:3]
+            with self._lock:
+                future = self.pending.pop(job_id, None)
+                if kind == 'result':
+                    self.outstanding[worker_id] -= 1
+            
+            if future is None:
+                continue
+            
+            if kind == 'metrics':
+                future.set_result(message[3])
+            else:
+                result, error = message[3:]
+                if isinstance(error, CaptureRejected):
+                    future.set_exception(error)
+                elif error is not None:
+                    future.set_exception(RuntimeError(f"Worker {worker_id}: {error}"))
+                else:
+                    future.set_result(result)
+    
+    def _register(self, worker_id=None):
+        future = Future()
+        with self._lock:
+            job_id = next(self._job_ids)
+            if worker_id is None:
+                worker_id = min(range(self.num_workers), key=lambda i: self.outstanding[i])
+                self.outstanding[worker_id] += 1
+            self.pending[job_id] = future
+        return job_id, worker_id, future
+    
+    def submit(self, payload):
+        job_id, worker_id, future = self._register()
+        self.task_queues[worker_id].put(('predict', job_id, payload))
+        return future
+    
+    def predict(self, payload, timeout=None):
+        return self.submit(payload).result(timeout=timeout)
+    
+    def collect_metrics(self, timeout=10):
+        futures = []
+        for worker_id, task_queue in enumerate(self.task_queues):
+            job_id, _, future = self._register(worker_id)
+            task_queue.put(('metrics', job_id, None))
+            futures.append(future)
+        
+        per_worker = [future.result(timeout=timeout) for future in futures]
+        latencies = np.array([l for worker in per_worker for l in worker['latencies']])
+        
+        summary = {
+            'workers': per_worker,
+            'processed': sum(w['processed'] for w in per_worker),
+            'errors': sum(w['errors'] for w in per_worker),
+            'rejected': sum(w['rejected'] for w in per_worker),
+            'busy_time': sum(w['busy_time'] for w in per_worker),
+            'rss_mb': sum(w['memory'].get('Rss', 0) for w in per_worker),
+            'pss_mb': sum(w['memory'].get('Pss', 0) for w in per_worker),
+            'latency_ms': None
+        }
+        
+        if len(latencies):
+            summary['latency_ms'] = {
+                'mean': latencies.mean() * 1000,
+                'p50': np.percentile(latencies, 50) * 1000,
+                'p95': np.percentile(latencies, 95) * 1000,
+                'p99': np.percentile(latencies, 99) * 1000
+            }
+        
+        return summary
+    
+    def print_metrics(self, summary):
+        print("\n" + "─" * 60)
+        print("WORKER METRICS")
+        print("─" * 60)
+        
+        for worker in summary['workers']:
+            memory = worker['memory']
+            print(f"   worker {worker['worker_id']} (pid {worker['pid']}): "
+                  f"{worker['processed']} scans, {worker['errors']} errors, {worker['rejected']} rescans, "
+                  f"busy {worker['busy_time']:.1f}s, "
+                  f"RSS {memory.get('Rss', 0):.0f} MB, PSS {memory.get('Pss', 0):.0f} MB")
+        
+        print(f"\nTotal scans:  {summary['processed']}")
+        print(f"Total errors: {summary['errors']}")
+        print(f"Rescans:      {summary['rejected']}")
+        if summary['latency_ms'] is not None:
+            latency = summary['latency_ms']
+            print(f"Latency:      mean {latency['mean']:.2f} ms, p50 {latency['p50']:.2f} ms, "
+                  f"p95 {latency['p95']:.2f} ms, p99 {latency['p99']:.2f} ms")
+        print(f"Memory:       RSS {summary['rss_mb']:.0f} MB summed, PSS {summary['pss_mb']:.0f} MB actual")
+    
+    def _answer(self, connection, template=None, chunks=None):
+        use_template = (
+            template is not None
+            and self.config.TEMPLATE_MODEL_PATH.exists()
+            and self.predictor.get_modality(connection.port) == "template"
+        )
+        image = None if use_template else decode_capture(chunks)
+        if use_template:
+            payload = {'template': template}
+        elif image is not None:
+            payload = image
+        else:
+            image_path, _ = self.predictor.pick_dataset_image()
+            if image_path is None:
+                print("❌ No images found in dataset")
+                return
+            payload = {'demo_image': str(image_path)}
+        
+        try:
+            blood_group, confidence, _ = self.predict(payload)
+        except CaptureRejected as e:
+            connection.write(b"RESCAN\n")
+            print(f"⚠️  {connection.port}: {str(e)}")
+            return
+        connection.write(f"BLOOD_GROUP:{blood_group}\n".encode())
+        print(f"🩸 {connection.port}: {blood_group} ({confidence*100:.1f}%)")
+    
+    def _serve_port(self, connection):
+        capturing = False
+        data_received = False
+        template = None
+        chunks = []
+        
+        while not self._stop_event.is_set():
+            try:
+                line = connection.readline().decode('utf-8', errors='ignore').strip()
+                if not line:
+                    continue
+                
+                if line == "FINGERPRINT_START":
+                    capturing = True
+                    data_received = False
+                    template = None
+                    chunks = []
+                elif capturing:
+                    if line.startswith("FINGERPRINT_DATA:"):
+                        chunks.append(line[len("FINGERPRINT_DATA:"):])
+                        data_received = True
+                    elif line.startswith("FINGERPRINT_TEMPLATE:"):
+                        template = line[len("FINGERPRINT_TEMPLATE:"):]
+                        data_received = True
+                    elif line == "FINGERPRINT_END":
+                        capturing = False
+                        if data_received:
+                            self._answer(connection, template, chunks)
+                elif line == "PREDICT_NOW":
+                    self._answer(connection)
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break
+                print(f"❌ Error on {connection.port}: {str(e)}")
+    
+    def run_serial(self, ports=None):
+        ports = ports or self.config.PREFORK_SERIAL_PORTS
+        connections = []
+        
+        if ports:
+            for port in ports:
+                try:
+                    connections.append(serial.Serial(port, self.config.BAUD_RATE, timeout=self.config.SERIAL_TIMEOUT))
+                    print(f"✅ Connected to {port}")
+                except Exception as e:
+                    print(f"❌ Failed to connect to {port}: {str(e)}")
+        else:
+            connection = self.predictor.find_esp32_port()
+            if connection is not None:
+                connections.append(connection)
+        
+        if not connections:
+            print("❌ No serial ports available")
+            return
+        
+        print("\n" + "═" * 60)
+        print(f"SERVER RUNNING - {len(connections)} station(s), {self.num_workers} worker(s)")
+        print("═" * 60)
+        
+        threads = [threading.Thread(target=self._serve_port, args=(c,), daemon=True) for c in connections]
+        for thread in threads:
+            thread.start()
+        
+        try:
+            while any(thread.is_alive() for thread in threads):
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Server stopped by user")
+        finally:
+            self._stop_event.set()
+            for connection in connections:
+                connection.close()
+    
+    def stop(self):
+        for task_queue in self.task_queues:
+            task_queue.put(None)
+        for process in self.workers:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        
+        if self.result_queue is not None:
+            self.result_queue.put(None)
+        if self._collector is not None:
+            self._collector.join()
+        
+        print("\n✅ Server shutdown complete")
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process blood group inference server sharing one memory-mapped model")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes (default: runtime profile, then CPU count)")
+    parser.add_argument('--ports', nargs='*', default=None, help="Serial ports to serve (default: auto-detect ESP32)")
+    parser.add_argument('--modality', nargs='*', default=[], metavar='PORT=MODALITY', help="Per-port input modality, overriding Config.DEVICE_MODALITY")
+    args = parser.parse_args()
+    
+    device_modality = {}
+    for item in args.modality:
+        port, _, modality = item.rpartition('=')
+        if not port or modality not in ('image', 'template'):
+            parser.error(f"invalid --modality '{item}' (expected PORT=image or PORT=template)")
+        device_modality[port] = modality
+    
+    server = PreforkServer(num_workers=args.workers)
+    server.predictor.device_modality.update(device_modality)
+    server.start()
+    try:
+        server.run_serial(args.ports)
+        server.print_metrics(server.collect_metrics())
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
+
+# File: python_ml/prefork_server.py
\ No newline at end of file
@@ -0,0 +1,297 @@
+# File: python_ml/runtime_tuning.py
+
+import os
+import sys
+import json
+import time
+import socket
+import queue
+import argparse
+import multiprocessing
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+from dataset_store import list_class_images
+
+_applied_profile = None
+
+def cpu_topology():
+    try:
+        logical = len(os.sched_getaffinity(0))
+    except AttributeError:
+        logical = os.cpu_count() or 1
+    
+    cores = set()
+    try:
+        with open("/proc/cpuinfo") as f:
+            physical_id = None
+            for line in f:
+                key, _, value = line.partition(':')
+                key = key.strip()
+                if key == 'physical id':
+                    physical_id = value.strip()
+                elif key == 'core id':
+                    cores.add((physical_id, value.strip()))
+    except OSError:
+        pass
+    
+    physical = min(len(cores), logical) if cores else logical
+    return {'logical': logical, 'physical': max(physical, 1)}
+
+def profile_path(hostname=None):
+    return config.Config.RUNTIME_PROFILE_DIR / f"{hostname or socket.gethostname()}.json"
+
+def load_runtime_profile(hostname=None):
+    path = profile_path(hostname)
+    if not path.exists():
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def scale_profile(profile, workers):
+    scaled = dict(profile)
+    total_threads = profile['intra_op_threads'] * profile['workers']
+    scaled['workers'] = workers
+    scaled['intra_op_threads'] = max(1, total_threads // workers)
+    scaled['cv2_threads'] = 1 if workers > 1 else scaled['intra_op_threads']
+    return scaled
+
+def apply_runtime_profile(profile):
+    global _applied_profile
+    if _applied_profile is not None:
+        return _applied_profile
+    
+    import cv2
+    import tensorflow as tf
+    
+    cv2.setNumThreads(profile['cv2_threads'])
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(profile['intra_op_threads'])
+        tf.config.threading.set_inter_op_parallelism_threads(profile['inter_op_threads'])
+    except RuntimeError:
+        print("⚠️  TensorFlow already initialized, runtime thread profile not applied")
+        return None
+    
+    _applied_profile = profile
+    print(
+        f"✅ Runtime profile applied: {profile['intra_op_threads']} intra-op / {profile['inter_op_threads']} inter-op "
+        f"thread(s), {profile['cv2_threads']} OpenCV thread(s), {profile['workers']} worker(s)"
+    )
+    return profile
+
+def candidate_profiles(topology, max_workers=None):
+    max_workers = max_workers or topology['physical']
+    
+    worker_counts = sorted({w for w in (1, 2, 4, 8, 16, 32, 64, max_workers) if w <= max_workers})
+    candidates = []
+    for workers in worker_counts:
+        intra_options = sorted({max(1, topology['physical'] // workers), max(1, topology['logical'] // workers)})
+        for intra in intra_options:
+            for inter in (1, 2):
+                candidates.append({
+                    'workers': workers,
+                    'intra_op_threads': intra,
+                    'inter_op_threads': inter,
+                    'cv2_threads': 1 if workers > 1 else intra
+                })
+    return candidates
+
+def load_sample_images(predictor, num_images):
+    per_class = max(1, num_images // config.Config.NUM_CLASSES)
+    images = []
+    for blood_group in config.Config.BLOOD_GROUPS:
+        for path in list_class_images(config.Config.DATASET_ROOT, blood_group)[:per_class]:
+            try:
+                images.append(predictor.load_image(path))
+            except ValueError:
+                pass
+    
+    if not images:
+        rng = np.random.default_rng(42)
+        shape = (config.Config.FINGERPRINT_HEIGHT, config.Config.FINGERPRINT_WIDTH, 3)
+        images = [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(num_images)]
+    return images
+
+def _trial_worker(profile, model_path, shared_model_path, seconds, num_images, start_event, result_queue):
+    sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+    try:
+        apply_runtime_profile(profile)
+        
+        from inference_server import BloodGroupPredictor
+        
+        predictor = BloodGroupPredictor(model_path=model_path)
+        predictor.load_model_and_artifacts(shared_model_path, profile['intra_op_threads'])
+        images = load_sample_images(predictor, num_images)
+        
+        model, _ = predictor.get_active_model()
+        warmup = predictor.preprocess_image(images[0])
+        for _ in range(config.Config.WORKER_WARMUP_RUNS):
+            model.predict_on_batch(warmup)
+    except Exception as e:
+        result_queue.put(('failed', str(e)))
+        return
+    
+    result_queue.put(('ready', None))
+    start_event.wait()
+    
+    latencies = []
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        scan_start = time.perf_counter()
+        model.predict_on_batch(predictor.preprocess_image(images[len(latencies) % len(images)]))
+        latencies.append(time.perf_counter() - scan_start)
+    
+    result_queue.put(('done', (len(latencies), time.perf_counter() - start, latencies)))
+
+def run_trial(profile, model_path=None, shared_model_path=None, seconds=None, num_images=None, timeout=None):
+    seconds = seconds or config.Config.RUNTIME_TUNE_SECONDS
+    num_images = num_images or config.Config.RUNTIME_TUNE_IMAGES
+    timeout = timeout or config.Config.RUNTIME_TUNE_STARTUP_TIMEOUT
+    
+    context = multiprocessing.get_context('spawn')
+    result_queue = context.Queue()
+    start_event = context.Event()
+    processes = [
+        context.Process(
+            target=_trial_worker,
+            args=(profile, model_path, shared_model_path, seconds, num_images, start_event, result_queue),
+            daemon=True
+        )
+        for _ in range(profile['workers'])
+    ]
+    for process in processes:
+        process.start()
+    
+    try:
+        for _ in processes:
+            status, error = result_queue.get(timeout=timeout)
+            if status == 'failed':
+                raise RuntimeError(error)
+        
+        start_event.set()
+        results = [result_queue.get(timeout=seconds + timeout)[1] for _ in processes]
+    except queue.Empty:
+        raise RuntimeError("trial timed out")
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+    
+    processed = sum(count for count, _, _ in results)
+    elapsed = max(duration for _, duration, _ in results)
+    latencies = np.concatenate([np.asarray(scan_latencies) for _, _, scan_latencies in results]) * 1000
+    return {
+        'throughput': processed / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+        'p95_ms': float(np.percentile(latencies, 95)) if len(latencies) else 0.0
+    }
+
+class RuntimeAutoTuner:
+    def __init__(self, model_path=None, seconds=None, max_workers=None, max_p95_ms=None):
+        self.config = config.Config
+        self.model_path = Path(model_path) if model_path is not None else self.config.MODEL_PATH
+        self.seconds = seconds or self.config.RUNTIME_TUNE_SECONDS
+        self.max_workers = max_workers
+        self.shared_model_path = None
+        self.max_p95_ms = self.config.RUNTIME_TUNE_MAX_P95_MS if max_p95_ms is None else max_p95_ms
+        self.topology = cpu_topology()
+        self.results = []
+    
+    def benchmark(self, profile):
+        try:
+            return run_trial(profile, model_path=self.model_path, shared_model_path=self.shared_model_path, seconds=self.seconds)
+        except RuntimeError as e:
+            print(f"   ⚠️  Trial failed: {str(e)}")
+            return None
+    
+    def run(self):
+        print("\n╔" + "═" * 58 + "╗")
+        print("║" + " " * 17 + "RUNTIME AUTO-TUNING" + " " * 22 + "║")
+        print("╚" + "═" * 58 + "╝")
+        
+        if not self.model_path.exists():
+            raise FileNotFoundError(f"❌ Model not found: {self.model_path}")
+        
+        from model_registry import ensure_shared_model
+        
+        self.shared_model_path = ensure_shared_model(self.model_path, multiprocessing.get_context('spawn'))
+        candidates = candidate_profiles(self.topology, self.max_workers)
+        print(f"\n📊 Host: {socket.gethostname()} ({self.topology['physical']} physical / {self.topology['logical']} logical cores)")
+        print(f"→ Benchmarking {len(candidates)} configuration(s) on single-scan requests, {self.seconds}s each...")
+        
+        print("\n" + "─" * 60)
+        print(f"{'Workers':>7s} {'Intra':>5s} {'Inter':>5s} {'cv2':>4s} {'img/s':>9s} {'p95 ms':>8s}")
+        print("─" * 60)
+        for profile in candidates:
+            result = self.benchmark(profile)
+            if result is None:
+                continue
+            self.results.append((profile, result))
+            print(
+                f"{profile['workers']:>7d} {profile['intra_op_threads']:>5d} {profile['inter_op_threads']:>5d} "
+                f"{profile['cv2_threads']:>4d} {result['throughput']:>9.1f} {result['p95_ms']:>8.2f}"
+            )
+        
+        eligible = [
+            (profile, result) for profile, result in self.results
+            if self.max_p95_ms is None or result['p95_ms'] <= self.max_p95_ms
+        ]
+        if not eligible:
+            raise ValueError("❌ No configuration completed within the latency budget")
+        
+        best, result = max(eligible, key=lambda item: item[1]['throughput'])
+        return self.save(best, result)
+    
+    def save(self, profile, result):
+        profile = dict(profile)
+        profile.update({
+            'hostname': socket.gethostname(),
+            'physical_cores': self.topology['physical'],
+            'logical_cores': self.topology['logical'],
+            'model': self.model_path.name,
+            'throughput': round(result['throughput'], 2),
+            'p95_ms': round(result['p95_ms'], 3),
+            'tuned_at': time.strftime("%Y-%m-%d %H:%M:%S")
+        })
+        
+        path = profile_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(profile, f, indent=2)
+        
+        print(f"\n✅ Best: {profile['workers']} worker(s), {profile['intra_op_threads']} intra-op / "
+              f"{profile['inter_op_threads']} inter-op thread(s) "
+              f"→ {profile['throughput']:.1f} img/s")
+        print(f"💾 Runtime profile saved to: {path}")
+        return profile
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TensorFlow/OpenCV threading on this host and save the best runtime profile")
+    parser.add_argument('--model', type=Path, default=None, help="Model to benchmark (default: Config.MODEL_PATH)")
+    parser.add_argument('--seconds', type=float, default=None, help="Benchmark duration per configuration")
+    parser.add_argument('--max-workers', type=int, default=None, help="Largest worker count to try (default: physical cores)")
+    parser.add_argument('--max-p95-ms', type=float, default=None, help="Reject configurations with a slower p95 per-scan latency")
+    parser.add_argument('--show', action='store_true', help="Print the saved profile for this host and exit")
+    args = parser.parse_args()
+    
+    if args.show:
+        profile = load_runtime_profile()
+        if profile is None:
+            print(f"⚠️  No runtime profile for this host at: {profile_path()}")
+        else:
+            print(json.dumps(profile, indent=2))
+        return
+    
+    tuner = RuntimeAutoTuner(
+        model_path=args.model, seconds=args.seconds, max_workers=args.max_workers, max_p95_ms=args.max_p95_ms
+    )
+    tuner.run()
+
+if __name__ == "__main__":
+    main()
+
+# File: python_ml/runtime_tuning.py
\ No newline at end of file
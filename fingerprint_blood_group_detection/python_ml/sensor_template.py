@@ -0,0 +1,188 @@
+# File: python_ml/sensor_template.py
+
+import sys
+import time
+import argparse
+from pathlib import Path
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+from sklearn.utils.class_weight import compute_class_weight
+from tensorflow.keras import layers
+from tensorflow.keras.models import Model, load_model
+from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
+from tensorflow.keras.utils import to_categorical
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+from model_registry import file_version
+
+TEMPLATE_EXTENSIONS = {'.hex', '.txt', '.bin', '.dat'}
+
+def parse_template(data, size=None):
+    size = size or config.Config.TEMPLATE_BYTES
+    if isinstance(data, str):
+        data = data.strip()
+        if data.startswith("FINGERPRINT_TEMPLATE:"):
+            data = data[len("FINGERPRINT_TEMPLATE:"):]
+        try:
+            data = bytes.fromhex(data)
+        except ValueError:
+            raise ValueError("❌ Template is not valid hex")
+    
+    raw = np.frombuffer(bytes(data), dtype=np.uint8)
+    if len(raw) == 0:
+        raise ValueError("❌ Empty template")
+    
+    vector = np.zeros(size, dtype=np.float32)
+    vector[:min(size, len(raw))] = raw[:size]
+    return vector / 255.0
+
+def load_template_file(path):
+    path = Path(path)
+    if path.suffix.lower() in ('.bin', '.dat'):
+        return parse_template(path.read_bytes())
+    return parse_template(path.read_text(encoding='utf-8', errors='ignore'))
+
+class TemplateClassifier:
+    def __init__(self, model_path=None):
+        self.config = config.Config
+        self.model_path = Path(model_path) if model_path is not None else self.config.TEMPLATE_MODEL_PATH
+        self.model = None
+        self.version = None
+        self.label_encoder = LabelEncoder().fit(self.config.BLOOD_GROUPS)
+    
+    def load(self):
+        if not self.model_path.exists():
+            raise FileNotFoundError(f"❌ Template model not found: {self.model_path}")
+        self.model = load_model(self.model_path)
+        self.version = file_version(self.model_path)
+        self.model.predict(np.zeros((1, self.config.TEMPLATE_BYTES), dtype=np.float32), verbose=0)
+        return self
+    
+    def predict(self, template):
+        vector = parse_template(template)
+        predictions = self.model.predict(vector[None], verbose=0)[0]
+        
+        predicted_class_idx = np.argmax(predictions)
+        confidence = predictions[predicted_class_idx]
+        blood_group = self.label_encoder.classes_[predicted_class_idx]
+        
+        return blood_group, confidence, predictions
+    
+    def build_model(self):
+        inputs = layers.Input(shape=(self.config.TEMPLATE_BYTES,))
+        x = layers.Dense(256, activation='relu')(inputs)
+        x = layers.BatchNormalization()(x)
+        x = layers.Dropout(self.config.DROPOUT_RATE)(x)
+        x = layers.Dense(128, activation='relu')(x)
+        x = layers.Dropout(self.config.DROPOUT_RATE)(x)
+        outputs = layers.Dense(self.config.NUM_CLASSES, activation='softmax')(x)
+        
+        self.model = Model(inputs, outputs, name='blood_group_template')
+        self.model.compile(
+            optimizer=Adam(learning_rate=self.config.LEARNING_RATE),
+            loss='categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        
+        print("\n" + "─" * 60)
+        print("TEMPLATE MODEL")
+        print("─" * 60)
+        print(f"Input bytes: {self.config.TEMPLATE_BYTES}")
+        print(f"Parameters:  {self.model.count_params():,}")
+        return self.model
+    
+    def load_dataset(self, dataset_root=None):
+        print("\n" + "═" * 60)
+        print("LOADING TEMPLATE DATASET")
+        print("═" * 60)
+        
+        dataset_root = Path(dataset_root) if dataset_root is not None else self.config.TEMPLATE_DATASET_ROOT
+        vectors = []
+        labels = []
+        for blood_group in self.config.BLOOD_GROUPS:
+            folder = dataset_root / blood_group
+            if not folder.exists():
+                continue
+            count = 0
+            for path in sorted(folder.iterdir()):
+                if not path.is_file() or path.suffix.lower() not in TEMPLATE_EXTENSIONS:
+                    continue
+                try:
+                    vectors.append(load_template_file(path))
+                    labels.append(blood_group)
+                    count += 1
+                except ValueError as e:
+                    print(f"⚠️  Skipping {path.name}: {str(e)}")
+            print(f"   ✅ Loaded {count} templates from {blood_group}")
+        
+        if not vectors:
+            raise ValueError(f"❌ No templates found in: {dataset_root}")
+        
+        return np.stack(vectors), self.label_encoder.transform(labels)
+    
+    def train(self, dataset_root=None):
+        X, y = self.load_dataset(dataset_root)
+        y_categorical = to_categorical(y, num_classes=self.config.NUM_CLASSES)
+        
+        X_train, X_test, y_train, y_test, y_train_cat, y_test_cat = train_test_split(
+            X, y, y_categorical, test_size=self.config.TEST_SPLIT, random_state=42, stratify=y
+        )
+        
+        classes = np.unique(y_train)
+        weights = compute_class_weight(class_weight='balanced', classes=classes, y=y_train)
+        
+        self.build_model()
+        
+        print("\n" + "═" * 60)
+        print("TRAINING TEMPLATE MODEL")
+        print("═" * 60)
+        
+        callbacks = [
+            EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True),
+            ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=1e-6)
+        ]
+        self.model.fit(
+            X_train, y_train_cat,
+            validation_split=self.config.VAL_SPLIT / (1 - self.config.TEST_SPLIT),
+            epochs=self.config.TEMPLATE_EPOCHS,
+            batch_size=self.config.BATCH_SIZE,
+            class_weight=dict(zip(classes, weights)),
+            callbacks=callbacks,
+            verbose=1 if self.config.VERBOSE else 2
+        )
+        
+        test_loss, test_accuracy = self.model.evaluate(X_test, y_test_cat, verbose=0)
+        
+        start = time.perf_counter()
+        for vector in X_test[:self.config.LATENCY_BENCHMARK_RUNS]:
+            self.model.predict(vector[None], verbose=0)
+        latency = (time.perf_counter() - start) / max(min(len(X_test), self.config.LATENCY_BENCHMARK_RUNS), 1)
+        
+        print(f"\n📊 Test Loss:     {test_loss:.4f}")
+        print(f"📊 Test Accuracy: {test_accuracy:.4f}")
+        print(f"📊 Latency:       {latency * 1000:.2f} ms/template")
+        
+        self.model_path.parent.mkdir(parents=True, exist_ok=True)
+        self.model.save(self.model_path)
+        print(f"💾 Template model saved to: {self.model_path}")
+        
+        return test_accuracy
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the sensor-template blood group model")
+    parser.add_argument('dataset', type=Path, nargs='?', default=None, help="Folder with one sub-folder of templates per blood group")
+    args = parser.parse_args()
+    
+    print("\n╔" + "═" * 58 + "╗")
+    print("║" + " " * 16 + "SENSOR TEMPLATE TRAINING" + " " * 18 + "║")
+    print("╚" + "═" * 58 + "╝")
+    
+    TemplateClassifier().train(args.dataset)
+
+if __name__ == "__main__":
+    main()
+
+# File: python_ml/sensor_template.py
\ No newline at end of file
@@ -0,0 +1,128 @@
+# File: python_ml/tta.py
+
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+import config
+
+class TestTimeAugmenter:
+    def __init__(self, num_views=None, cutoff=None, scale=None, seed=42):
+        self.config = config.Config
+        self.num_views = num_views or self.config.TTA_VIEWS
+        self.cutoff = self.config.TTA_CONFIDENCE_CUTOFF if cutoff is None else cutoff
+        self.scale = self.config.TTA_AUGMENTATION_SCALE if scale is None else scale
+        self.transforms = self._sample_transforms(np.random.default_rng(seed))
+        self._grids = {}
+        self.stats = {
+            'calls': 0,
+            'triggered': 0,
+            'base_time': 0.0,
+            'tta_time': 0.0,
+        }
+    
+    def _sample_transforms(self, rng):
+        aug = self.config.AUGMENTATION_CONFIG
+        count = self.num_views - 1
+        
+        angles = np.deg2rad(rng.uniform(-1, 1, count) * aug.get('rotation_range', 0) * self.scale)
+        shift_x = rng.uniform(-1, 1, count) * aug.get('width_shift_range', 0) * self.scale
+        shift_y = rng.uniform(-1, 1, count) * aug.get('height_shift_range', 0) * self.scale
+        zoom = 1 + rng.uniform(-1, 1, count) * aug.get('zoom_range', 0) * self.scale
+        flip = np.where(
+            (np.arange(count) % 2 == 1) & aug.get('horizontal_flip', False), -1.0, 1.0
+        )
+        
+        cos, sin = np.cos(angles), np.sin(angles)
+        transforms = np.zeros((count, 2, 3), dtype=np.float32)
+        transforms[:, 0, 0] = cos * zoom * flip
+        transforms[:, 0, 1] = -sin * zoom
+        transforms[:, 1, 0] = sin * zoom * flip
+        transforms[:, 1, 1] = cos * zoom
+        transforms[:, 0, 2] = shift_x
+        transforms[:, 1, 2] = shift_y
+        return transforms
+    
+    def _sampling_grid(self, height, width):
+        key = (height, width)
+        if key in self._grids:
+            return self._grids[key]
+        
+        ys, xs = np.meshgrid(
+            np.linspace(-1, 1, height, dtype=np.float32),
+            np.linspace(-1, 1, width, dtype=np.float32),
+            indexing='ij'
+        )
+        coords = np.stack([xs, ys, np.ones_like(xs)], axis=-1)
+        source = np.einsum('nij,hwj->nhwi', self.transforms, coords)
+        
+        src_x = np.clip((source[..., 0] + 1) * 0.5 * (width - 1), 0, width - 1)
+        src_y = np.clip((source[..., 1] + 1) * 0.5 * (height - 1), 0, height - 1)
+        x0 = np.floor(src_x).astype(np.int32)
+        y0 = np.floor(src_y).astype(np.int32)
+        x1 = np.minimum(x0 + 1, width - 1)
+        y1 = np.minimum(y0 + 1, height - 1)
+        wx = (src_x - x0)[..., None]
+        wy = (src_y - y0)[..., None]
+        
+        self._grids[key] = (x0, y0, x1, y1, wx, wy)
+        return self._grids[key]
+    
+    def build_views(self, image):
+        height, width = image.shape[:2]
+        x0, y0, x1, y1, wx, wy = self._sampling_grid(height, width)
+        
+        top = image[y0, x0] * (1 - wx) + image[y0, x1] * wx
+        bottom = image[y1, x0] * (1 - wx) + image[y1, x1] * wx
+        views = top * (1 - wy) + bottom * wy
+        
+        return np.concatenate([image[None], views.astype(np.float32)], axis=0)
+    
+    def should_trigger(self, confidence):
+        return self.num_views > 1 and confidence < self.cutoff
+    
+    def predict(self, model, img_array, base_predictions=None, base_time=0.0):
+        self.stats['calls'] += 1
+        self.stats['base_time'] += base_time
+        
+        start = time.perf_counter()
+        views = self.build_views(img_array[0])
+        if base_predictions is not None:
+            predictions = model.predict(views[1:], batch_size=len(views) - 1, verbose=0)
+            predictions = np.concatenate([base_predictions[None], predictions], axis=0)
+        else:
+            predictions = model.predict(views, batch_size=len(views), verbose=0)
+        self.stats['tta_time'] += time.perf_counter() - start
+        self.stats['triggered'] += 1
+        
+        return predictions.mean(axis=0)
+    
+    def record_skip(self, base_time):
+        self.stats['calls'] += 1
+        self.stats['base_time'] += base_time
+    
+    def print_stats(self):
+        print("\n" + "─" * 60)
+        print("TEST-TIME AUGMENTATION STATISTICS")
+        print("─" * 60)
+        
+        calls = self.stats['calls']
+        triggered = self.stats['triggered']
+        if calls == 0:
+            print("No predictions made")
+            return
+        
+        mean_base = self.stats['base_time'] / calls * 1000
+        print(f"Views per scan:     {self.num_views}")
+        print(f"Confidence cutoff:  {self.cutoff*100:.0f}%")
+        print(f"Triggered:          {triggered}/{calls} ({triggered/calls*100:.1f}%)")
+        print(f"Mean base latency:  {mean_base:.2f} ms")
+        
+        if triggered:
+            mean_tta = self.stats['tta_time'] / triggered * 1000
+            print(f"Mean TTA overhead:  {mean_tta:.2f} ms ({mean_tta / max(mean_base, 1e-9):.2f}x a single pass)")
+            print(f"Overhead per scan:  {self.stats['tta_time'] / calls * 1000:.2f} ms averaged over all scans")
+
+# File: python_ml/tta.py
\ No newline at end of file